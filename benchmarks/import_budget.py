@@ -0,0 +1,151 @@
+"""
+Verifica o tempo de importação de cada modo de execução com python -X importtime
+
+Cada modo roda em um processo novo. O tempo de todos os módulos importados
+(inclusive os importados sob demanda durante a inicialização), descontados os que
+o interpretador já importa sozinho (python -c pass), precisa caber no orçamento
+do modo, e os módulos proibidos naquele modo não podem aparecer.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/import_budget.py                    # todos os modos
+    python benchmarks/import_budget.py --mode help
+    python benchmarks/import_budget.py --scale 4          # orçamentos x4 (ex.: Raspberry Pi)
+    python benchmarks/import_budget.py -o importtime.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliotecas de voz: só podem ser importadas quando a engine correspondente é escolhida
+VOICE_MODULES = ('RealtimeSTT', 'RealtimeTTS', 'speech_recognition', 'pyaudio')
+
+MODES = {
+    'help': {
+        'description': "main.py --help",
+        'command': ["main.py", "--help"],
+        'budget_ms': 30,
+        'forbidden': ('chatbot', 'numpy', 'rapidfuzz', 'pandas', 'pdfplumber', 'requests') + VOICE_MODULES,
+    },
+    'import': {
+        'description': "import chatbot",
+        'command': ["-c", "import chatbot"],
+        'budget_ms': 300,
+        # asyncio só com o motor de conversa, criado na inicialização do bot
+        'forbidden': ('asyncio', 'pandas', 'pdfplumber', 'requests') + VOICE_MODULES,
+    },
+    'interactive': {
+        'description': "main.py --interactive (entrada: 'sair')",
+        'command': ["main.py", "--interactive"],
+        'stdin': "sair\n",
+        # Com PDF_STORE=pandas o cache de tabelas traz o pandas (~60% do tempo); compact evita
+        'budget_ms': 900,
+        'forbidden': ('requests',) + VOICE_MODULES,
+    },
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Lê as linhas do -X importtime: tempo próprio, acumulado (µs), nível e módulo"""
+    entries = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                'module': name,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': (len(indent) - 1) // 2,
+            })
+    return entries
+
+
+def run_importtime(arguments: List[str], stdin: str = ""):
+    """Executa o Python com -X importtime e retorna (processo, entradas)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + arguments,
+        cwd=ROOT, env=dict(os.environ), input=stdin,
+        capture_output=True, text=True, timeout=600,
+    )
+    return result, parse_importtime(result.stderr)
+
+
+def check_mode(name: str, baseline: set, scale: float, top: int) -> dict:
+    """Roda um modo e confere orçamento e módulos proibidos"""
+    mode = MODES[name]
+    result, entries = run_importtime(mode['command'], mode.get('stdin', ""))
+    imported = {entry['module'] for entry in entries}
+    # Cada import de nível 0 já inclui seus filhos; os da inicialização do interpretador ficam de fora
+    total_ms = sum(e['cumulative_us'] for e in entries if e['depth'] == 0 and e['module'] not in baseline) / 1000
+    budget_ms = mode['budget_ms'] * scale
+    forbidden = sorted(
+        module for module in mode['forbidden']
+        if module in imported or any(other.startswith(module + ".") for other in imported)
+    )
+    # Tempo próprio somado por pacote raiz (numpy, pandas, modules...), fora a inicialização
+    packages: Dict[str, int] = {}
+    for entry in entries:
+        if entry['module'] not in baseline:
+            package = entry['module'].split(".")[0]
+            packages[package] = packages.get(package, 0) + entry['self_us']
+    heaviest = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return {
+        'mode': name,
+        'description': mode['description'],
+        'exit_code': result.returncode,
+        'total_ms': round(total_ms, 1),
+        'budget_ms': round(budget_ms, 1),
+        'modules': len(imported),
+        'forbidden_imported': forbidden,
+        'heaviest': [{'package': package, 'self_ms': round(us / 1000, 1)} for package, us in heaviest],
+        'ok': result.returncode == 0 and total_ms <= budget_ms and not forbidden,
+    }
+
+
+def print_report(report: dict):
+    """Mostra o resultado de um modo"""
+    status = "✅" if report['ok'] else "❌"
+    print(f"{status} {report['mode']:<12} {report['total_ms']:>8.1f} ms / {report['budget_ms']:.0f} ms "
+          f"({report['modules']} módulos) - {report['description']}")
+    for entry in report['heaviest']:
+        print(f"     {entry['self_ms']:>8.1f} ms  {entry['package']}")
+    if report['forbidden_imported']:
+        print(f"   ⚠️ Importados indevidamente: {', '.join(report['forbidden_imported'])}")
+    if report['exit_code'] != 0:
+        print(f"   ⚠️ Processo terminou com código {report['exit_code']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de importação por modo")
+    parser.add_argument("--mode", choices=sorted(MODES) + ["all"], default="all")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplica os orçamentos (hardware mais lento)")
+    parser.add_argument("--top", type=int, default=5, help="Quantos imports mais pesados mostrar")
+    parser.add_argument("-o", "--output", help="Grava os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    names = sorted(MODES) if args.mode == "all" else [args.mode]
+    _, startup = run_importtime(["-c", "pass"])
+    baseline = {entry['module'] for entry in startup}
+    reports: Dict[str, dict] = {}
+    for name in names:
+        reports[name] = check_mode(name, baseline, args.scale, args.top)
+        print_report(reports[name])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados gravados em {args.output}")
+    sys.exit(0 if all(report['ok'] for report in reports.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
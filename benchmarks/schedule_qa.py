@@ -0,0 +1,228 @@
+"""
+Benchmark de acurácia e latência das perguntas sobre horários (PDFReader.answer_question)
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/schedule_qa.py                        # roda e mostra o resumo
+    python benchmarks/schedule_qa.py -o resultado.json      # grava os resultados em JSON
+    python benchmarks/schedule_qa.py --compare antes.json   # compara com uma execução anterior
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.pdf_reader import PDFReader  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule_qa_corpus.json")
+DEFAULT_CLOCK = (0, 10 * 60)  # segunda, 10:00 - só usado por perguntas sem 'clock'
+
+
+def load_corpus(path: str) -> dict:
+    """Lê o corpus rotulado"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_correct(answer: Optional[str], expect: List[str]) -> List[str]:
+    """Retorna os trechos esperados que faltam na resposta (lista vazia = correta)"""
+    answer = (answer or "").lower()
+    return [part for part in expect if part.lower() not in answer]
+
+
+def ask(reader: PDFReader, item: dict) -> str:
+    """Faz a pergunta pela rota do item: 'schedule' (answer_question, padrão) ou
+    'search' (search_in_content, a busca livre usada quando nenhuma intenção casa)"""
+    if item.get('route') == 'search':
+        return reader.search_in_content(item['question'])
+    return reader.answer_question(item['question'])
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, média e máximo em milissegundos"""
+    if not samples:
+        return {}
+    values = np.array(samples) * 1e3
+    return {
+        'p50': round(float(np.percentile(values, 50)), 4),
+        'p95': round(float(np.percentile(values, 95)), 4),
+        'p99': round(float(np.percentile(values, 99)), 4),
+        'mean': round(float(values.mean()), 4),
+        'max': round(float(values.max()), 4),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Commit atual do repositório, para identificar a execução"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run(args) -> dict:
+    """Carrega o PDFReader, mede a acurácia e a latência de cada pergunta do corpus"""
+    corpus = load_corpus(args.corpus)
+    questions = corpus['questions']
+    clock = [DEFAULT_CLOCK]
+
+    start = time.perf_counter()
+    reader = PDFReader(data_folder=args.data, use_cache=not args.no_cache, lazy=args.lazy,
+                       store=args.store, answer_cache_size=args.answer_cache,
+                       clock=lambda: clock[0])
+    load_seconds = time.perf_counter() - start
+
+    results = []
+    for item in questions:
+        clock[0] = tuple(item.get('clock', DEFAULT_CLOCK))
+        try:
+            answer = ask(reader, item)
+        except Exception as e:
+            answer = f"EXCEÇÃO {type(e).__name__}: {e}"
+        missing = is_correct(answer, item['expect'])
+        results.append({
+            'id': item['id'],
+            'category': item.get('category', ''),
+            'question': item['question'],
+            'answer': answer,
+            'correct': not missing,
+            'missing': missing,
+            'latencies': [],
+        })
+
+    # Rodadas cronometradas (a primeira passada acima serve de aquecimento)
+    total_elapsed = 0.0
+    for _ in range(args.rounds):
+        for item, result in zip(questions, results):
+            clock[0] = tuple(item.get('clock', DEFAULT_CLOCK))
+            t = time.perf_counter()
+            try:
+                ask(reader, item)
+            except Exception:
+                pass
+            elapsed = time.perf_counter() - t
+            total_elapsed += elapsed
+            result['latencies'].append(elapsed)
+
+    categories = {}
+    for result in results:
+        stats = categories.setdefault(result['category'], {'correct': 0, 'total': 0})
+        stats['total'] += 1
+        stats['correct'] += result['correct']
+    for stats in categories.values():
+        stats['accuracy'] = round(stats['correct'] / stats['total'], 4)
+
+    all_latencies = [value for result in results for value in result['latencies']]
+    correct = sum(result['correct'] for result in results)
+    for result in results:
+        result['latency_ms'] = percentiles(result.pop('latencies'))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'corpus': os.path.relpath(args.corpus, ROOT),
+            'corpus_version': corpus.get('version'),
+            'store': reader.store,
+            'lazy': args.lazy,
+            'disk_cache': not args.no_cache,
+            'answer_cache_size': args.answer_cache,
+            'rounds': args.rounds,
+        },
+        'summary': {
+            'total': len(results),
+            'correct': correct,
+            'accuracy': round(correct / len(results), 4) if results else 0.0,
+            'by_category': dict(sorted(categories.items())),
+            'latency_ms': percentiles(all_latencies),
+            'qps': round(len(all_latencies) / total_elapsed, 1) if total_elapsed else 0.0,
+            'load_seconds': round(load_seconds, 4),
+        },
+        'questions': results,
+    }
+
+
+def print_summary(report: dict):
+    """Mostra o resumo de uma execução"""
+    summary = report['summary']
+    latency = summary['latency_ms']
+    print("=" * 60)
+    print(f"📊 Acurácia: {summary['correct']}/{summary['total']} ({summary['accuracy']:.1%})")
+    for category, stats in summary['by_category'].items():
+        print(f"   {category:<12} {stats['correct']}/{stats['total']} ({stats['accuracy']:.1%})")
+    if latency:
+        print(f"⏱️ Latência (ms): p50 {latency['p50']:.3f} | p95 {latency['p95']:.3f} | "
+              f"p99 {latency['p99']:.3f} | máx {latency['max']:.3f}")
+    print(f"⚡ {summary['qps']:.0f} perguntas/s | carregamento {summary['load_seconds']:.2f}s")
+    for result in report['questions']:
+        if not result['correct']:
+            print(f"❌ {result['id']}: {result['question']}")
+            print(f"   resposta: {result['answer']}")
+            print(f"   faltando: {', '.join(result['missing'])}")
+
+
+def print_comparison(before: dict, after: dict):
+    """Mostra as diferenças de acurácia, latência e respostas entre duas execuções"""
+    print("=" * 60)
+    print(f"🔍 Comparando {before['meta'].get('git')} ({before['meta']['timestamp']}) "
+          f"-> {after['meta'].get('git')} ({after['meta']['timestamp']})")
+    old, new = before['summary'], after['summary']
+    print(f"   acurácia: {old['accuracy']:.1%} -> {new['accuracy']:.1%}")
+    for key in ('p50', 'p95', 'p99'):
+        a, b = old['latency_ms'].get(key), new['latency_ms'].get(key)
+        if a and b:
+            print(f"   {key}: {a:.3f} -> {b:.3f} ms ({(b - a) / a:+.0%})")
+    if old['qps'] and new['qps']:
+        print(f"   perguntas/s: {old['qps']:.0f} -> {new['qps']:.0f} ({(new['qps'] - old['qps']) / old['qps']:+.0%})")
+
+    previous = {result['id']: result for result in before['questions']}
+    for result in after['questions']:
+        old_result = previous.get(result['id'])
+        if old_result is None:
+            print(f"   ➕ {result['id']} (nova)")
+        elif old_result['correct'] != result['correct']:
+            mark = "✅" if result['correct'] else "❌"
+            print(f"   {mark} {result['id']}: {old_result['answer']} -> {result['answer']}")
+        elif old_result['answer'] != result['answer']:
+            print(f"   ✏️ {result['id']}: {old_result['answer']} -> {result['answer']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das perguntas sobre horários")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Corpus rotulado (JSON)")
+    parser.add_argument("--data", default=os.path.join(ROOT, "data"), help="Pasta com os PDFs")
+    parser.add_argument("--rounds", type=int, default=20, help="Rodadas cronometradas sobre o corpus")
+    parser.add_argument("--store", default="pandas", choices=("pandas", "compact"), help="Formato das tabelas")
+    parser.add_argument("--lazy", action="store_true", help="Carregamento sob demanda")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache em disco das tabelas")
+    parser.add_argument("--answer-cache", type=int, default=0,
+                        help="Tamanho do cache de respostas (0 = mede o caminho completo)")
+    parser.add_argument("-o", "--output", help="Grava os resultados neste arquivo JSON")
+    parser.add_argument("--compare", help="Resultado JSON anterior para comparar")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_summary(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados gravados em {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,19 @@
 import os
 import sys
-import threading
-import time
 from typing import Optional, Callable
 from dotenv import load_dotenv
 
 # Importa todos os módulos
 from modules.stt import STTManager
 from modules.tts import TTSManager
-from modules.pdf_reader import PDFReader
+from modules.pdf_reader import PDFReader, create_extraction_pool
 from modules.weather import WeatherManager
 from modules.time_utils import TimeManager
 from modules.dialogue_manager import DialogueManager
+from modules.intent_matcher import default_matcher
+from modules.intent_router import IntentRouter
+from modules.startup import ComponentLoader
+from modules.resource_usage import format_usage_table
 
 
 class PudimBot:
@@ -22,6 +24,17 @@ class PudimBot:
     
     _instance = None
     _initialized = False
+
+    # Palavras-chave dos comandos de controle, compiladas no IntentMatcher
+    CONTROL_KEYWORDS = {
+        'pause': ['parar', 'pausar', 'pare'],
+        'exit': ['sair', 'desligar', 'stop'],
+    }
+
+    # Frases fixas do bot (o áudio delas fica no cache em disco do TTS)
+    INITIAL_MESSAGE = "{greeting}! Eu sou o {bot_name}. Como posso ajudar você?"
+    PAUSE_MESSAGE = "Ok, vou pausar. Me chame pelo nome quando quiser que eu volte."
+    RESUME_MESSAGE = "Voltei! O que você precisa?"
     
     def __new__(cls):
         """Implementa padrão Singleton"""
@@ -42,10 +55,16 @@ class PudimBot:
         self.user_name = os.getenv('USER_NAME', 'Usuário')
         self.debug = os.getenv('DEBUG', 'False').lower() == 'true'
         
+        # Motor único de intenções, compartilhado por todos os módulos
+        self.matcher = default_matcher
+        self.matcher.register('control', self.CONTROL_KEYWORDS)
+        
         # Estado do bot
         self.is_running = False
         self.is_paused = False
         self.conversation_active = False
+        self.conversation_minutes = 0
+        self.startup_report = {}  # tempos e memória de cada etapa da inicialização
         
         # Inicializa componentes (carrega modelos na memória)
         self._initialize_components()
@@ -55,40 +74,135 @@ class PudimBot:
         print("=" * 50)
     
     def _initialize_components(self):
-        """Inicializa todos os componentes do bot - carrega modelos na memória"""
+        """Inicializa todos os componentes do bot - carrega modelos na memória.
+
+        Componentes independentes (STT, TTS, PDFs...) carregam em paralelo;
+        STARTUP_WORKERS=1 volta à carga sequencial.
+        """
         try:
             print("🔄 Carregando modelos na memória...")
+            loader = ComponentLoader()
+            loader.add('stt', self._init_stt)
+            loader.add('tts', self._init_tts)
+            loader.add('time', self._init_time)
+            loader.add('pdf', self._init_pdf_reader, depends_on=['time'])
+            loader.add('weather', self._init_weather)
+            loader.add('dialogue', self._init_dialogue)
+            loader.add('conversation', self._init_conversation)
+            loader.add('router', self._build_router, depends_on=['time', 'weather', 'dialogue', 'pdf'])
+            loader.add('voice_cache', self._init_voice_cache, depends_on=['tts', 'dialogue'])
+            # Processos da extração de PDFs criados antes das threads do boot (fork, não spawn)
+            self._pdf_pool = None
+            if os.getenv('PDF_LAZY_LOADING', 'False').lower() != 'true':
+                self._pdf_pool = create_extraction_pool(
+                    workers=int(os.getenv('PDF_WORKERS', '1')),
+                    store=os.getenv('PDF_STORE', 'pandas')
+                )
+            try:
+                loader.run(max_workers=int(os.getenv('STARTUP_WORKERS', '4')))
+            finally:
+                if self._pdf_pool is not None:
+                    self._pdf_pool.shutdown()
+                    self._pdf_pool = None
+                    if hasattr(self, 'pdf_reader'):
+                        self.pdf_reader.executor = None
+            self.startup_report = {
+                'total_s': loader.total_seconds,
+                'stages': loader.timings,
+                'pdfs': dict(self.pdf_reader.load_timings),
+            }
             
-            # STT (Speech-to-Text)
-            whisper_model = os.getenv('WHISPER_MODEL', 'tiny')
-            self.stt = STTManager(model_name=whisper_model)
+            print(f"✅ Todos os componentes carregados na memória em {loader.total_seconds:.2f}s!")
             if self.debug:
-                print(f"🎤 Engine STT: {self.stt.get_engine_info()}")
-            
-            # TTS (Text-to-Speech)
-            tts_engine = os.getenv('TTS_ENGINE', 'system')
-            self.tts = TTSManager(engine_type=tts_engine)
-            
-            # PDF Reader
-            self.pdf_reader = PDFReader()
-            
-            # Weather Manager
-            api_key = os.getenv('OPENWEATHER_API_KEY', '')
-            city = os.getenv('CITY_NAME', 'Rio de Janeiro')
-            country = os.getenv('COUNTRY_CODE', 'BR')
-            self.weather = WeatherManager(api_key, city, country)
-            
-            # Time Manager
-            self.time_manager = TimeManager()
-            
-            # Dialogue Manager
-            self.dialogue = DialogueManager(self.bot_name, self.user_name)
-            
-            print("✅ Todos os componentes carregados na memória!")
+                rows = dict(self.startup_report['stages'])
+                rows.update((f"pdf:{code} ({usage['source']})", usage)
+                            for code, usage in self.startup_report['pdfs'].items())
+                print(format_usage_table(rows))
             
         except Exception as e:
             print(f"❌ Erro ao carregar componentes: {e}")
             sys.exit(1)
+
+    def _init_stt(self):
+        """STT (Speech-to-Text)"""
+        whisper_model = os.getenv('WHISPER_MODEL', 'tiny')
+        self.stt = STTManager(model_name=whisper_model)
+        if self.debug:
+            print(f"🎤 Engine STT: {self.stt.get_engine_info()}")
+
+    def _init_tts(self):
+        """TTS (Text-to-Speech)"""
+        tts_engine = os.getenv('TTS_ENGINE', 'system')
+        self.tts = TTSManager(
+            engine_type=tts_engine,
+            cache_folder=os.getenv('TTS_CACHE_FOLDER', os.path.join('data', '.cache', 'tts')),
+            memory_cache_mb=float(os.getenv('TTS_MEMORY_CACHE_MB', '16')),
+            streaming=os.getenv('TTS_STREAMING', 'True').lower() == 'true'
+        )
+
+    def _init_voice_cache(self):
+        """Áudio das frases fixas: pré-sintetizado em segundo plano ou na primeira vez que for dito"""
+        prerender = os.getenv('TTS_PRERENDER', 'True').lower() == 'true'
+        self.tts.register_canned(self._canned_lines(), prerender=prerender)
+
+    def _init_time(self):
+        """Time Manager (também é o relógio das perguntas de "agora" do PDF Reader)"""
+        self.time_manager = TimeManager()
+
+    def _init_pdf_reader(self):
+        """PDF Reader"""
+        pdf_budget = float(os.getenv('PDF_MEMORY_BUDGET_MB', '0'))
+        self.pdf_reader = PDFReader(
+            lazy=os.getenv('PDF_LAZY_LOADING', 'False').lower() == 'true',
+            memory_budget_mb=pdf_budget or None,
+            workers=int(os.getenv('PDF_WORKERS', '1')),
+            store=os.getenv('PDF_STORE', 'pandas'),
+            answer_cache_size=int(os.getenv('PDF_ANSWER_CACHE_SIZE', '256')),
+            clock=self.time_manager.get_schedule_moment,
+            executor=self._pdf_pool
+        )
+        watch_interval = float(os.getenv('PDF_WATCH_INTERVAL', '0'))
+        if watch_interval > 0:
+            self.pdf_reader.start_watching(watch_interval)
+
+    def _init_weather(self):
+        """Weather Manager"""
+        api_key = os.getenv('OPENWEATHER_API_KEY', '')
+        city = os.getenv('CITY_NAME', 'Rio de Janeiro')
+        country = os.getenv('COUNTRY_CODE', 'BR')
+        self.weather = WeatherManager(api_key, city, country)
+
+    def _init_conversation(self):
+        """Motor de conversa: filas STT -> resposta -> fala"""
+        # Importados aqui: o asyncio do motor pesa no import do chatbot (benchmarks/import_budget.py)
+        from modules.conversation import ConversationEngine
+        from modules.speculation import SpeculativeResponder
+        self.conversation = ConversationEngine(
+            self._handle_utterance,
+            speaker=lambda text: self.tts.speak(text),
+            queue_size=int(os.getenv('CONVERSATION_QUEUE_SIZE', '4')),
+            overflow=os.getenv('CONVERSATION_QUEUE_OVERFLOW', 'drop_oldest'),
+            speech_queue_size=int(os.getenv('SPEECH_QUEUE_SIZE', '8')),
+            speech_overflow=os.getenv('SPEECH_QUEUE_OVERFLOW', 'block'),
+            echo_guard=float(os.getenv('SPEECH_ECHO_GUARD', '0.3')),
+        )
+        # Respostas adiantadas a partir das transcrições parciais do STT
+        self.speculation = SpeculativeResponder(
+            self._speculative_answer,
+            prepare=lambda response, cancel: self.tts.prepare(response, cancel),
+        )
+
+    def _init_dialogue(self):
+        """Dialogue Manager"""
+        self.dialogue = DialogueManager(self.bot_name, self.user_name)
+
+    def _canned_lines(self) -> list:
+        """Frases que o bot sempre fala do mesmo jeito (candidatas ao cache de áudio em disco)"""
+        lines = self.dialogue.canned_responses()
+        for greeting in ("Bom dia", "Boa tarde", "Boa noite"):
+            lines.append(self.INITIAL_MESSAGE.format(greeting=greeting, bot_name=self.bot_name))
+        lines += [self.PAUSE_MESSAGE, self.RESUME_MESSAGE]
+        return lines
     
     def activate_conversation(self, duration_minutes: int = 5) -> bool:
         """
@@ -98,7 +212,9 @@ class PudimBot:
         Returns:
             bool: True se a conversa foi iniciada com sucesso
         """
-        if self.conversation_active:
+        # O motor só fica livre depois do on_finish da conversa anterior, que ainda
+        # vai parar o STT: até lá uma conversa nova não pode começar
+        if self.conversation_active or self.conversation.active:
             print("⚠️ Conversa já está ativa")
             return False
         
@@ -109,69 +225,90 @@ class PudimBot:
         
         # Cumprimento inicial
         greeting = self.time_manager.get_greeting()
-        initial_message = f"{greeting}! Eu sou o {self.bot_name}. Como posso ajudar você?"
+        initial_message = self.INITIAL_MESSAGE.format(greeting=greeting, bot_name=self.bot_name)
         self.tts.speak(initial_message)
         
-        # Inicia thread para conversa com timeout
-        conversation_thread = threading.Thread(
-            target=self._conversation_loop, 
-            args=(duration_minutes,), 
-            daemon=False
-        )
-        conversation_thread.start()
-
+        # O motor de conversa espera falas, parada e timeout como eventos
+        self.conversation_minutes = duration_minutes
+        if not self.conversation.start(duration_minutes * 60, on_finish=self._finish_conversation):
+            print("⚠️ A conversa anterior ainda está terminando")
+            self.conversation_active = False
+            self.is_running = False
+            return False
+        self.stt.set_callback(lambda text: self.conversation.submit(text, started=self.stt.utterance_started))
+        if self.stt.supports_partials():
+            self.stt.set_partial_callback(self._on_partial_transcript)
+        if self.stt.is_available():
+            self.stt.start_listening()
+            print(f"🎤 {self.bot_name} está ouvindo... (timeout: {duration_minutes}min)")
+        else:
+            print("⚠️ STT não disponível. Usando timeout apenas.")
         
         return True
     
     def deactivate_conversation(self):
-        """Desativa o chatbot e retorna controle"""
+        """Desativa o chatbot e retorna controle (espera a despedida terminar)"""
+        if self.conversation.stop(wait=True):
+            return
+        self._finish_conversation()
+    
+    def wait_conversation(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até a conversa atual terminar (False se o timeout expirar antes)"""
+        return self.conversation.wait(timeout)
+    
+    def _finish_conversation(self, reason: Optional[str] = None):
+        """Encerra a conversa: chamado pelo motor ao terminar (timeout, parada ou 'sair')"""
+        from modules.conversation import FINISH_EXIT, FINISH_TIMEOUT
+        if reason == FINISH_TIMEOUT:
+            print(f"⏰ Timeout de {self.conversation_minutes} minutos atingido")
         print(f"🔇 Desativando {self.bot_name}...")
         self.conversation_active = False
         self.is_running = False
         self.stt.stop_listening()
+        self.stt.set_partial_callback(None)
+        self.speculation.reset()
         
-        # Mensagem de despedida
-        farewell = self.dialogue.get_random_response('farewell')
-        self.tts.speak(farewell)
+        # Mensagem de despedida (no comando de saída ela já foi falada)
+        if reason != FINISH_EXIT:
+            farewell = self.dialogue.get_random_response('farewell')
+            self.tts.speak(farewell)
         
         print(f"✅ {self.bot_name} desativado - controle retornado")
     
-    def _conversation_loop(self, duration_minutes: int):
-        """Loop principal da conversa com timeout"""
-        start_time = time.time()
-        timeout = duration_minutes * 60  # Converte para segundos
-        
-        # Configura callback do STT
-        self.stt.set_callback(self.process_user_input)
-        
-        if self.stt.is_available():
-            self.stt.start_listening()
-            print(f"🎤 {self.bot_name} está ouvindo... (timeout: {duration_minutes}min)")
-        else:
-            print("⚠️ STT não disponível. Usando timeout apenas.")
-        
-        try:
-            while self.conversation_active and self.is_running:
-                # Verifica timeout
-                if time.time() - start_time > timeout:
-                    print(f"⏰ Timeout de {duration_minutes} minutos atingido")
-                    break
-                
-                # Se pausado, escuta apenas por ativação
-                if self.is_paused:
-                    user_input = self.stt.listen_once(timeout=5.0)
-                    if user_input and self.dialogue.is_bot_activation(user_input):
-                        self.is_paused = False
-                        response = "Voltei! O que você precisa?"
-                        self.tts.speak(response)
-                        print(f"🎤 {self.bot_name} retomou a escuta...")
-                
-                time.sleep(0.5)
-                
-        except Exception as e:
-            print(f"❌ Erro na conversa: {e}")
-        finally:
-            self.deactivate_conversation()
+    def _say(self, text: str):
+        """Fala uma resposta: na conversa, pela fila da etapa de fala; fora dela, direto"""
+        if not self.conversation.say(text):
+            self.tts.speak(text)
+    
+    def _on_partial_transcript(self, text: str):
+        """Transcrição parcial estável: começa a preparar a resposta antes do fim da fala"""
+        if self.is_paused or self.conversation.speaking:  # com o bot falando, é eco
+            return
+        if self.dialogue.is_bot_activation(text):
+            text = self.dialogue.clean_bot_name_from_text(text)
+        self.speculation.on_partial(text)
+    
+    def _speculative_answer(self, text: str) -> Optional[str]:
+        """Resposta especulativa: só perguntas de horário (sem efeitos colaterais)"""
+        candidates = self.router.rank(text)
+        if not candidates or candidates[0][1].name != 'schedule':
+            return None
+        response = self._answer_schedule(text)
+        # Parcial incompleta (ex.: ainda sem o curso): não vale pré-sintetizar o aviso
+        if response is None or response.startswith("⚠️"):
+            return None
+        return response
+    
+    def _handle_utterance(self, text: str):
+        """Trata uma fala da conversa; pausado, só o nome do bot o faz voltar"""
+        if self.is_paused:
+            if self.dialogue.is_bot_activation(text):
+                self.is_paused = False
+                response = self.RESUME_MESSAGE
+                self._say(response)
+                print(f"🎤 {self.bot_name} retomou a escuta...")
+            return
+        self.process_user_input(text)
     
     def quick_response(self, text: str) -> str:
         """
@@ -189,6 +326,23 @@ class PudimBot:
         else:
             return self.dialogue.get_random_response('unknown')
     
+    def answer(self, text: str) -> str:
+        """
+        Responde uma pergunta sem mexer no estado do bot (API do modo serviço,
+        compartilhada por vários processos): ignora os comandos de controle
+        (pausar/sair), a pausa da conversa e a resposta especulativa dela
+        Args:
+            text: Pergunta
+        Returns:
+            str: Resposta gerada
+        """
+        response = self.router.route(text, exclude=('control',))
+        if response:
+            return response
+        if self.dialogue.is_farewell(text):
+            return self.dialogue.handle_social_interaction(text, is_farewell=True)
+        return self.dialogue.get_random_response('unknown')
+    
     def speak_and_listen_once(self, message: str = None, timeout: float = 10.0) -> Optional[str]:
         """
         Fala uma mensagem e escuta uma resposta única
@@ -218,7 +372,7 @@ class PudimBot:
         # Verifica se o bot está sendo ativado pelo nome
         if self.dialogue.is_bot_activation(text):
             response = self.dialogue.get_random_response('activation')
-            self.tts.speak(response)
+            self._say(response)
             
             # Remove o nome do bot para processar o resto do comando
             text = self.dialogue.clean_bot_name_from_text(text)
@@ -234,71 +388,87 @@ class PudimBot:
         elif response:
             if self.debug:
                 print(f"🔍 DEBUG - Resposta: '{response}'")
-            self.tts.speak(response)
-        else:
-            # Resposta padrão para quando não entende
+            self._say(response)
+        elif response is None:
+            # Resposta padrão para quando não entende ("" = comando já tratado, ex.: sair)
             unknown_response = self.dialogue.get_random_response('unknown')
-            self.tts.speak(unknown_response)
+            self._say(unknown_response)
     
     def _generate_response(self, text: str) -> Optional[str]:
         """Gera resposta baseada no texto de entrada"""
-        # 1. Verifica interações sociais
         print(f"🤖 Processando entrada: '{text}'")
         if self.is_paused:
             return "paused"
-        elif not self.is_paused:
-            if self.dialogue.is_social_interaction(text) and not self.dialogue.is_farewell(text):
-                return self.dialogue.handle_social_interaction(text)
-            
-            # 2. Verifica perguntas sobre data/hora
-            if self.time_manager.is_time_question(text):
-                return self.time_manager.format_time_response(text)
-            
-            # 3. Verifica perguntas sobre clima
-            if self.weather.is_weather_question(text):
-                return self.weather.format_weather_response()
-            
-            # 4. Comandos de controle
-            if self._is_control_command(text) or self.dialogue.is_farewell(text):
-                return self._handle_control_command(text)
-            
-            # 5. Busca nos PDFs
-            pdf_response = self.pdf_reader.answer_question(text)
-            if pdf_response:
-                return pdf_response
-            
-            # 6. Se não encontrou resposta específica, tenta busca geral nos PDFs
-            general_results = self.pdf_reader.search_in_content(text)
-            if general_results and "Não encontrei" not in general_results:
-                return general_results
-        
+        # Se a transcrição final confirma a parcial, a resposta já está pronta
+        response = self.speculation.take(text)
+        if response is not None:
+            if self.debug:
+                print("⚡ DEBUG - Resposta especulativa confirmada")
+            return response
+        return self.router.route(text)
+
+    def _build_router(self):
+        """Registra as rotas de intenção (a prioridade desempata pontuações iguais)"""
+        self.router = IntentRouter(self.matcher, debug=self.debug)
+        social_intents = [f"social.{name}" for name in DialogueManager.KEYWORDS if name != 'farewell']
+        self.router.add_route('social', social_intents, self._answer_social, priority=0)
+        self.router.add_route('time', ['time'], self.time_manager.format_time_response, priority=1)
+        self.router.add_route('weather', ['weather'], lambda text: self.weather.format_weather_response(), priority=2)
+        self.router.add_route('control', ['control.pause', 'control.exit', 'social.farewell'],
+                              self._handle_control_command, priority=3)
+        self.router.add_route('schedule', ['pdf.horario', 'pdf.professor', 'pdf.sala',
+                                           'pdf.professor_classes', 'pdf.room_classes',
+                                           'pdf.room_now', 'pdf.next_class', 'pdf.free_rooms'],
+                              self._answer_schedule, priority=4)
+        self.router.add_route('search', [], self._answer_search, priority=5, fallback=True)
+
+    def _answer_social(self, text: str) -> Optional[str]:
+        """Interações sociais; despedidas ficam com os comandos de controle"""
+        if self.dialogue.is_farewell(text):
+            return None
+        return self.dialogue.handle_social_interaction(text)
+
+    def _answer_schedule(self, text: str) -> Optional[str]:
+        """Perguntas sobre horário, professor e sala das disciplinas"""
+        response = self.pdf_reader.answer_question(text)
+        if not response or response.startswith("❌"):
+            return None
+        return response
+
+    def _answer_search(self, text: str) -> Optional[str]:
+        """Busca geral nos PDFs quando nenhuma intenção específica respondeu"""
+        general_results = self.pdf_reader.search_in_content(text)
+        if general_results and "Não encontrei" not in general_results:
+            return general_results
         return None
     
     def _is_control_command(self, text: str) -> bool:
         """Verifica se é um comando de controle"""
-        control_words = ['parar', 'pausar', 'sair', 'desligar', 'pare', 'stop']
-        text_lower = text.lower()
-        return any(word in text_lower for word in control_words)
+        return self.matcher.matches_any(text, 'control.')
     
     def _handle_control_command(self, text: str) -> str:
         """Lida com comandos de controle"""
-        text_lower = text.lower()
+        intents = self.matcher.match(text)
         
-        if any(word in text_lower for word in ['parar', 'pausar', 'pare']):
+        if 'control.pause' in intents:
             self.is_paused = True
-            return "Ok, vou pausar. Me chame pelo nome quando quiser que eu volte."
+            return self.PAUSE_MESSAGE
         
-        elif any(word in text_lower for word in ['sair', 'desligar', 'stop', 'tchau', 'até logo']) or self.dialogue.is_farewell(text):
-            self.tts.speak(self.dialogue.handle_social_interaction(text, is_farewell=True))
-            self.conversation_active = False
-            self.is_running = False
+        elif 'control.exit' in intents or self.dialogue.is_farewell(text):
+            from modules.conversation import FINISH_EXIT
+            self._say(self.dialogue.handle_social_interaction(text, is_farewell=True))
+            # Na conversa por voz os estados são limpos em _finish_conversation, quando o
+            # motor termina; sem motor (modo interativo) o loop para aqui
+            if not self.conversation.stop(reason=FINISH_EXIT):
+                self.conversation_active = False
+                self.is_running = False
             return ""
         
         return "Comando não reconhecido."
     
     def is_ready(self) -> bool:
         """Verifica se o bot está pronto para uso"""
-        return PudimBot._initialized and not self.conversation_active
+        return PudimBot._initialized and not self.conversation_active and not self.conversation.active
     
     def get_status(self) -> dict:
         """Retorna status atual do bot"""
@@ -308,7 +478,13 @@ class PudimBot:
             'is_running': self.is_running,
             'is_paused': self.is_paused,
             'stt_available': self.stt.is_available() if hasattr(self, 'stt') else False,
-            'stt_engine': self.stt.get_engine_info() if hasattr(self, 'stt') else 'N/A'
+            'stt_engine': self.stt.get_engine_info() if hasattr(self, 'stt') else 'N/A',
+            'pdf_answer_cache': self.pdf_reader.get_cache_stats() if hasattr(self, 'pdf_reader') else None,
+            'pipeline': self.conversation.stats() if hasattr(self, 'conversation') else None,
+            'speculation': self.speculation.get_stats() if hasattr(self, 'speculation') else None,
+            'tts_cache': self.tts.get_cache_stats() if hasattr(self, 'tts') else None,
+            'tts_speech': self.tts.get_speech_stats() if hasattr(self, 'tts') else None,
+            'startup': self.startup_report
         }
     
     # Métodos antigos mantidos para compatibilidade (agora deprecados)
@@ -391,6 +567,11 @@ def ask_question(question: str) -> str:
     bot = get_bot_instance()
     return bot.quick_response(question)
 
+def wait_conversation(timeout: Optional[float] = None) -> bool:
+    """Interface simples para esperar o fim da conversa atual"""
+    bot = get_bot_instance()
+    return bot.wait_conversation(timeout)
+
 def speak_and_listen(message: str = None, timeout: float = 10.0) -> Optional[str]:
     """Interface simples para falar e escutar"""
     bot = get_bot_instance()
@@ -6,9 +6,9 @@ consulta PDFs locais, informa clima e horários, e realiza interações sociais.
 
 """
 
+import os
 import sys
 import argparse
-from chatbot import PudimBot, initialize_bot
 
 
 def show_help():
@@ -18,7 +18,7 @@ def show_help():
 
 MODOS DE EXECUÇÃO:
   --interactive    Modo interativo via texto (para desenvolvimento/teste)
-  --service        Modo serviço (carrega bot na memória e aguarda)
+  --service        Modo serviço (carrega o bot e atende a API local)
   --conversation   Inicia conversa por voz imediatamente
   --help           Mostra esta ajuda
 
@@ -28,9 +28,19 @@ EXEMPLOS:
   python main.py --conversation    # Conversa por voz
   python main.py                   # Modo padrão (conversa por voz)
 
+ENGINES DE VOZ (.env):
+  STT_ENGINE=realtime_stt|speech_recognition|text
+  TTS_ENGINE=kokoro|piper|system|none
+  Só a engine escolhida é importada; --interactive usa text/none.
+
 INTEGRAÇÃO COM ROBÔ:
-  O modo --service é ideal para integração com código de movimento do robô.
-  Use as funções do módulo chatbot.py para controlar o bot externamente.
+  O modo --service mantém um único bot residente e expõe ask_question,
+  start_conversation, stop_conversation, speak_and_listen e get_status
+  por HTTP/JSON em SERVICE_HOST:SERVICE_PORT (padrão 127.0.0.1:8765)
+  ou no socket Unix SERVICE_SOCKET. Outros processos usam
+  modules.service.ServiceClient, sem carregar os modelos:
+    client = ServiceClient()
+    client.ask_question("qual o horário de física 3 de cc")
 """
     print(help_text)
 
@@ -42,17 +52,30 @@ def run_interactive_mode(bot):
 
 
 def run_service_mode(bot):
-    """Executa modo serviço"""
+    """Executa modo serviço: atende a API local até Ctrl+C"""
+    from modules.service import DEFAULT_HOST, DEFAULT_PORT, create_server
+
     print("🔧 Modo Serviço")
+    socket_path = os.getenv('SERVICE_SOCKET', '').strip() or None
+    server = create_server(
+        bot,
+        host=os.getenv('SERVICE_HOST', DEFAULT_HOST),
+        port=int(os.getenv('SERVICE_PORT', str(DEFAULT_PORT))),
+        socket_path=socket_path,
+        debug=bot.debug,
+    )
+    address = socket_path or "http://%s:%d" % server.server_address[:2]
+    print(f"🔌 API local ouvindo em {address}")
     print("Bot carregado na memória e pronto para uso externo.")
-    print("Use as funções do módulo chatbot.py para controlar.")
     print("Pressione Ctrl+C para encerrar.")
     try:
-        import time
-        while True:
-            time.sleep(1)
+        server.serve_forever()
     except KeyboardInterrupt:
         print("\n👋 Encerrando serviço...")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
 
 
 def run_conversation_mode(bot):
@@ -98,8 +121,16 @@ def main():
         show_help()
         return
     
+    if args.interactive:
+        # Modo texto não usa microfone nem voz: evita importar e carregar as engines
+        os.environ['STT_ENGINE'] = 'text'
+        os.environ['TTS_ENGINE'] = 'none'
+    
     print("🤖 Inicializando Pudim...")
     
+    # Importado só depois dos argumentos: --help não carrega os módulos do bot
+    from chatbot import initialize_bot
+    
     try:
         # Inicializa o bot (carrega modelos na memória)
         bot = initialize_bot()
@@ -0,0 +1,120 @@
+"""
+Módulo de cache do áudio sintetizado pelo TTS
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+
+class AudioCache:
+    """Guarda o áudio PCM já sintetizado para tocar de novo sem sintetizar.
+
+    Frases fixas (registradas com register_canned) ficam também em disco, um
+    arquivo por frase, numa pasta própria de cada engine/voz/formato de áudio;
+    trocar de engine ou de voz usa outra pasta. Todo áudio usado recentemente,
+    fixo ou dinâmico, fica numa LRU em memória limitada por bytes.
+    """
+
+    def __init__(self, cache_folder: Optional[str], namespace: str, memory_limit_bytes: int = 16 * 1024 * 1024):
+        self.folder = None
+        if cache_folder:
+            self.folder = os.path.join(cache_folder, re.sub(r"[^\w.-]+", "_", namespace))
+            try:
+                os.makedirs(self.folder, exist_ok=True)
+            except OSError as e:
+                print(f"⚠️ Cache de áudio em disco desabilitado: {e}")
+                self.folder = None
+        self.memory_limit = memory_limit_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # texto -> áudio PCM, em ordem de uso
+        self._memory_bytes = 0
+        self._canned = set()
+        self._lock = threading.Lock()
+
+    def _entry_path(self, text: str) -> str:
+        """Caminho do arquivo de uma frase (SHA-256 do texto)"""
+        return os.path.join(self.folder, hashlib.sha256(text.encode("utf-8")).hexdigest() + ".pcm")
+
+    def register_canned(self, texts: Iterable[str]):
+        """Marca frases fixas: o áudio delas é gravado em disco"""
+        with self._lock:
+            self._canned.update(text for text in texts if text)
+
+    def is_canned(self, text: str) -> bool:
+        return text in self._canned
+
+    def missing_canned(self) -> List[str]:
+        """Frases fixas que ainda não têm áudio em disco"""
+        if self.folder is None:
+            return []
+        return sorted(text for text in self._canned if not os.path.exists(self._entry_path(text)))
+
+    def get(self, text: str) -> Optional[bytes]:
+        """Retorna o áudio da frase (memória, depois disco) ou None"""
+        with self._lock:
+            audio = self._memory.get(text)
+            if audio is not None:
+                self._memory.move_to_end(text)
+                self.memory_hits += 1
+                return audio
+        if self.folder is not None and text in self._canned:
+            try:
+                with open(self._entry_path(text), "rb") as f:
+                    audio = f.read()
+            except OSError:
+                audio = None
+            if audio:
+                self._remember(text, audio)
+                with self._lock:
+                    self.disk_hits += 1
+                return audio
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, audio: bytes):
+        """Armazena o áudio de uma frase (em disco só se ela for fixa)"""
+        if not audio:
+            return
+        if self.folder is not None and text in self._canned:
+            entry_path = self._entry_path(text)
+            tmp_path = entry_path + ".tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, entry_path)
+            except OSError as e:
+                print(f"⚠️ Não foi possível gravar o áudio em cache: {e}")
+        self._remember(text, audio)
+
+    def _remember(self, text: str, audio: bytes):
+        """Coloca na LRU em memória, descartando as frases usadas há mais tempo"""
+        if len(audio) > self.memory_limit:
+            return
+        with self._lock:
+            previous = self._memory.pop(text, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[text] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.memory_limit:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / total if total else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_mb': round(self._memory_bytes / 1024 / 1024, 2),
+                'canned': len(self._canned),
+            }
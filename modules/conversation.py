@@ -0,0 +1,220 @@
+"""
+Módulo do motor de conversa orientado a eventos (asyncio)
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+from modules.pipeline import PipelineStage
+
+# Motivos de término passados para on_finish
+FINISH_TIMEOUT = "timeout"
+FINISH_STOP = "stop"
+FINISH_EXIT = "exit"
+
+
+class ConversationEngine:
+    """Conduz uma conversa em um loop asyncio próprio, sem verificação periódica.
+
+    A conversa é um pipeline em etapas ligadas por filas limitadas:
+    captura (thread do STT, via submit) -> resposta (handler) -> fala (speaker,
+    via say). O STT volta a escutar assim que entrega a fala, sem esperar a
+    resposta nem a reprodução. O pedido de parada (stop) e o fim do tempo da
+    conversa são eventos aguardados pelo loop. Quem precisa esperar o fim da
+    conversa usa wait().
+
+    Como o microfone continua aberto enquanto o bot fala, a captura descarta
+    (contando como eco) a fala cuja gravação se sobrepôs à reprodução da etapa
+    de fala ou aos echo_guard segundos seguintes: seria o próprio bot transcrito.
+    Quem fala junto com o bot precisa repetir depois que ele terminar.
+    """
+
+    def __init__(self, handler: Callable[[str], None], speaker: Optional[Callable[[str], None]] = None,
+                 queue_size: int = 4, overflow: str = 'drop_oldest',
+                 speech_queue_size: int = 8, speech_overflow: str = 'block',
+                 echo_guard: float = 0.3):
+        """
+        Args:
+            handler: Trata uma fala transcrita (etapa de resposta)
+            speaker: Reproduz um texto (etapa de fala); sem ele, say() não é usado
+            queue_size/overflow: Fila entre o STT e a resposta; drop_oldest descarta
+                a pergunta mais antiga quando as falas chegam mais rápido do que são respondidas
+            speech_queue_size/speech_overflow: Fila entre a resposta e a fala; block
+                faz a resposta esperar a fala em vez de perder respostas
+            echo_guard: Segundos após o fim de cada reprodução em que a captura
+                ainda é tratada como eco (reverberação e atraso do áudio)
+        """
+        self.response = PipelineStage('response', handler, queue_size, overflow)
+        self.speaker = speaker
+        self.speech = PipelineStage('speech', self._speak, speech_queue_size, speech_overflow) if speaker else None
+        self.echo_guard = max(0.0, echo_guard)
+        self.heard = 0  # falas entregues pelo STT durante conversas
+        self.rejected = 0  # falas entregues sem conversa ativa
+        self.echoes = 0  # falas descartadas por terem sido gravadas enquanto o bot falava
+        # Última reprodução da etapa de fala (time.monotonic); fim None enquanto toca
+        self._speech_started: Optional[float] = None
+        self._speech_ended: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._accepting = False
+        self._stop_event: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()  # protege o estado entre o loop e quem chama submit/say/stop
+        self._thread: Optional[threading.Thread] = None
+        self._stop_reason: Optional[str] = None
+        self._done = threading.Event()
+        self._done.set()
+        self.finish_reason: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return not self._done.is_set()
+
+    def start(self, duration_seconds: float, on_finish: Optional[Callable[[str], None]] = None) -> bool:
+        """Inicia a conversa; on_finish(motivo) roda na thread do motor ao terminar"""
+        with self._lock:
+            if self.active:
+                return False
+            self._done.clear()
+            self._stop_reason = None
+            self.finish_reason = None
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._thread_main, args=(duration_seconds, on_finish, ready),
+            name="conversation", daemon=False
+        )
+        self._thread.start()
+        ready.wait()  # submit() já é aceito quando start() retorna
+        return True
+
+    def _in_engine(self) -> bool:
+        """True na thread do motor ou em um handler das etapas (onde esperar travaria)"""
+        ident = threading.get_ident()
+        return (threading.current_thread() is self._thread or ident == self.response.handler_thread
+                or (self.speech is not None and ident == self.speech.handler_thread))
+
+    @property
+    def speaking(self) -> bool:
+        """True enquanto a etapa de fala reproduz uma resposta"""
+        return self._speech_started is not None and self._speech_ended is None
+
+    def _is_echo(self, started: Optional[float]) -> bool:
+        """A gravação [started, agora] se sobrepõe à última reprodução (mais a margem)?
+
+        Sem o início da gravação, só o instante da entrega é comparado.
+        """
+        speech_started, speech_ended = self._speech_started, self._speech_ended
+        if speech_started is None:
+            return False
+        now = time.monotonic()
+        if speech_ended is None:
+            return True
+        return now >= speech_started and (started if started is not None else now) <= speech_ended + self.echo_guard
+
+    def submit(self, text: str, wait: bool = False, started: Optional[float] = None) -> bool:
+        """Entrega uma fala à etapa de resposta (chamado pela thread do STT).
+
+        started é o início da gravação da fala (time.monotonic), usado para
+        descartar o eco da própria fala do bot. Retorna logo após enfileirar; com
+        a política 'block' e a fila cheia, espera por espaço. Com wait=True também
+        espera a fila aceitar ou descartar a fala. Retorna False sem conversa ativa
+        ou quando a fala é descartada como eco.
+        """
+        with self._lock:
+            if not self._accepting:
+                self.rejected += 1
+                return False
+            self.heard += 1
+            if self._is_echo(started):
+                self.echoes += 1
+                return False
+            future = asyncio.run_coroutine_threadsafe(self.response.put(text), self._loop)
+        if (wait or self.response.stats.overflow == 'block') and not self._in_engine():
+            return future.result()
+        return True
+
+    def say(self, text: str) -> bool:
+        """Entrega um texto à etapa de fala; False sem conversa ativa (o chamador fala direto)"""
+        with self._lock:
+            if self._loop is None or self.speech is None:
+                return False
+            future = asyncio.run_coroutine_threadsafe(self.speech.put(text), self._loop)
+        if not self._in_engine() or threading.get_ident() == self.response.handler_thread:
+            future.result()  # backpressure: com 'block' a resposta espera a fila de fala
+        return True
+
+    def stop(self, reason: str = FINISH_STOP, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """Pede o fim da conversa.
+
+        A fala em tratamento termina e as pendentes são descartadas. As respostas
+        já enfileiradas para fala são ditas, exceto em uma parada externa (FINISH_STOP).
+        """
+        with self._lock:
+            if not self._accepting:
+                return False
+            if self._stop_reason is None:
+                self._stop_reason = reason
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        # De dentro do motor (handler ou on_finish) esperar travaria a própria conversa
+        if wait and not self._in_engine():
+            self._done.wait(timeout)
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até a conversa terminar; retorna False se o timeout expirar antes"""
+        return self._done.wait(timeout)
+
+    def stats(self) -> dict:
+        """Contadores de cada etapa (profundidade da fila, descartes, latências)"""
+        stages = {'capture': {'heard': self.heard, 'rejected': self.rejected, 'echo': self.echoes,
+                              'echo_guard_s': self.echo_guard},
+                  'response': self.response.stats.snapshot()}
+        if self.speech is not None:
+            stages['speech'] = self.speech.stats.snapshot()
+        return stages
+
+    def _speak(self, text: str):
+        """Handler da etapa de fala: marca o intervalo da reprodução para o filtro de eco"""
+        self._speech_ended = None
+        self._speech_started = time.monotonic()
+        try:
+            self.speaker(text)
+        finally:
+            self._speech_ended = time.monotonic()
+
+    def _thread_main(self, duration_seconds: float, on_finish, ready: threading.Event):
+        try:
+            reason = asyncio.run(self._run(duration_seconds, ready))
+            self.finish_reason = reason
+            if on_finish:
+                on_finish(reason)
+        except Exception as e:
+            print(f"❌ Erro na conversa: {e}")
+        finally:
+            ready.set()
+            self._done.set()
+
+    async def _run(self, duration_seconds: float, ready: threading.Event) -> str:
+        loop = asyncio.get_running_loop()
+        self.response.start()
+        if self.speech is not None:
+            self.speech.start()
+        with self._lock:
+            self._loop = loop
+            self._stop_event = asyncio.Event()
+            self._accepting = True
+        ready.set()
+        reason = FINISH_TIMEOUT
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), max(0.0, duration_seconds))
+            reason = self._stop_reason or FINISH_STOP
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._accepting = False
+            # A resposta em andamento ainda pode mandar texto para a fala
+            await self.response.close(drain=False)
+            if self.speech is not None:
+                await self.speech.close(drain=reason != FINISH_STOP)
+            with self._lock:
+                self._loop = None
+        return reason
@@ -4,14 +4,64 @@ Módulo gerenciador de diálogos e interações sociais
 import random
 import re
 from typing import List, Optional
+from modules.intent_matcher import IntentMatcher, default_matcher
 
 
 class DialogueManager:
     """Gerenciador de diálogos e respostas sociais"""
+
+    # Palavras-chave de cada intenção social, compiladas no IntentMatcher
+    KEYWORDS = {
+        'greeting': [
+            'oi', 'olá', 'ola', 'ei', 'hey', 'bom dia', 'boa tarde', 
+            'boa noite', 'salve', 'e aí', 'eai', 'hello'
+        ],
+        'farewell': [
+            'tchau', 'até logo', 'até mais', 'adeus', 'bye', 'até a próxima', 'falou'
+        ],
+        'how_are_you': [
+            'como está', 'como vai', 'como você está', 'tudo bem',
+            'tudo ok', 'beleza', 'como anda', 'como tem passado', 'como você tem estado',
+        ],
+        'how_are_you_answer': [
+            'estou bem', 'tudo bem', 'tudo ok', 'estou ótimo', 'estou legal',
+            'estou feliz', 'estou tranquilo', 'estou de boa', 'tudo certo',
+            'tudo tranquilo', 'tudo beleza', 'tudo jóia', 'tudo em paz', 'tudo'
+        ],
+        'help': [
+            'pode me ajudar', 'poderia me ajudar', 'me ajuda', 'me ajude'
+        ],
+        'function': [
+            'o que você faz', 'para que serve', 'o que você pode fazer',
+            'o que você sabe fazer', 'quais são suas funções',
+            'quais são suas habilidades', 'o que você pode me ajudar',
+        ],
+        'joke': [
+            'me conta uma piada', 'conte uma piada', 'faz uma piada',
+            'conta uma piada', 'me faz rir', 'me faça rir', 'eu quero rir',
+        ],
+        'positive_feedback': [
+            'bom trabalho', 'ótimo trabalho', 'muito bom', 'excelente',
+            'parabéns', 'legal', 'show de bola', 'incrível', 'fantástico',
+            'maravilhoso', 'adorei', 'gostei muito'
+        ],
+        'negative_feedback': [
+            'ruim', 'péssimo', 'horrível', 'não gostei', 'não é bom',
+            'decepcionante', 'fraco', 'lixo', 'horrendo', 'terrível',
+            'não funciona', 'não ajuda'
+        ],
+        'gratitude': [
+            'obrigado', 'obrigada', 'valeu', 'agradeço', 'muito obrigado',
+            'muito obrigada', 'grato', 'grata', 'agradecido', 'agradecida'
+        ],
+    }
     
-    def __init__(self, bot_name: str = "Pudim", user_name: str = "Usuário"):
+    def __init__(self, bot_name: str = "Pudim", user_name: str = "Usuário",
+                 matcher: Optional[IntentMatcher] = None):
         self.bot_name = bot_name
         self.user_name = user_name
+        self.matcher = matcher or default_matcher
+        self.matcher.register('social', self.KEYWORDS)
         
         # Respostas variadas para diferentes situações
         self.greetings = [
@@ -112,104 +162,44 @@ class DialogueManager:
     
     def is_greeting(self, text: str) -> bool:
         """Verifica se é um cumprimento"""
-        greetings = [
-            'oi', 'olá', 'ola', 'ei', 'hey', 'bom dia', 'boa tarde', 
-            'boa noite', 'salve', 'e aí', 'eai', 'hello'
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{greeting}\b", text_lower) for greeting in greetings)
+        return self.matcher.matches(text, 'social.greeting')
     
     def is_farewell(self, text: str) -> bool:
         """Verifica se é uma despedida"""
-        farewells = [
-            'tchau', 'até logo', 'até mais', 'adeus', 'bye', 'até a próxima', 'falou'
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{farewell}\b", text_lower) for farewell in farewells)
+        return self.matcher.matches(text, 'social.farewell')
     
     def is_how_are_you(self, text: str) -> bool:
         """Verifica se está perguntando como está"""
-        questions = [
-            'como está', 'como vai', 'como você está', 'tudo bem',
-            'tudo ok', 'beleza', 'como anda', 'como tem passado', 'como você tem estado',
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{question}\b", text_lower) for question in questions)
+        return self.matcher.matches(text, 'social.how_are_you')
     
     def is_how_are_you_answer(self, text: str) -> bool:
         """Verifica se está respondendo como está"""
-        answers = [
-            'estou bem', 'tudo bem', 'tudo ok', 'estou ótimo', 'estou legal',
-            'estou feliz', 'estou tranquilo', 'estou de boa', 'tudo certo',
-            'tudo tranquilo', 'tudo beleza', 'tudo jóia', 'tudo em paz', 'tudo'
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{answer}\b", text_lower) for answer in answers)
+        return self.matcher.matches(text, 'social.how_are_you_answer')
 
     
     def is_help_request(self, text: str) -> bool:
         """Verifica se está pedindo ajuda"""
-        help_keywords = [
-            'pode me ajudar', 'poderia me ajudar', 'me ajuda', 'me ajude'
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{keyword}\b", text_lower) for keyword in help_keywords)
+        return self.matcher.matches(text, 'social.help')
     
     def is_function_question(self, text: str) -> bool:
         """Verifica se está perguntando sobre as funções do bot"""
-        function_keywords = [
-            'o que você faz', 'para que serve', 'o que você pode fazer',
-            'o que você sabe fazer', 'quais são suas funções',
-            'quais são suas habilidades', 'o que você pode me ajudar',
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{keyword}\b", text_lower) for keyword in function_keywords)
+        return self.matcher.matches(text, 'social.function')
     
     def is_joke_request(self, text: str) -> bool:
         """Verifica se está pedindo uma piada"""
-        joke_keywords = [
-            'me conta uma piada', 'conte uma piada', 'faz uma piada',
-            'conta uma piada', 'me faz rir', 'me faça rir', 'eu quero rir',
-        ]
-
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{keyword}\b", text_lower) for keyword in joke_keywords)
+        return self.matcher.matches(text, 'social.joke')
     
     def is_positive_feedback(self, text: str) -> bool:
         """Verifica se é um feedback positivo"""
-        positive_keywords = [
-            'bom trabalho', 'ótimo trabalho', 'muito bom', 'excelente',
-            'parabéns', 'legal', 'show de bola', 'incrível', 'fantástico',
-            'maravilhoso', 'adorei', 'gostei muito'
-        ]
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{keyword}\b", text_lower) for keyword in positive_keywords)
+        return self.matcher.matches(text, 'social.positive_feedback')
     
     def is_negative_feedback(self, text: str) -> bool:
         """Verifica se é um feedback negativo"""
-        negative_keywords = [
-            'ruim', 'péssimo', 'horrível', 'não gostei', 'não é bom',
-            'decepcionante', 'fraco', 'lixo', 'horrendo', 'terrível',
-            'não funciona', 'não ajuda'
-        ]
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{keyword}\b", text_lower) for keyword in negative_keywords)
+        return self.matcher.matches(text, 'social.negative_feedback')
 
     def is_gratitude(self, text: str) -> bool:
         """Verifica se está agradecendo"""
-        gratitude_keywords = [
-            'obrigado', 'obrigada', 'valeu', 'agradeço', 'muito obrigado',
-            'muito obrigada', 'grato', 'grata', 'agradecido', 'agradecida'
-        ]
-        
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{keyword}\b", text_lower) for keyword in gratitude_keywords)
+        return self.matcher.matches(text, 'social.gratitude')
 
 
 
@@ -224,9 +214,9 @@ class DialogueManager:
                 f" {bot_name_lower}" in text_lower or
                 f"{bot_name_lower}," in text_lower)
     
-    def get_random_response(self, response_type: str) -> str:
-        """Retorna uma resposta aleatória do tipo especificado"""
-        responses = {
+    def _responses(self) -> dict:
+        """Listas de respostas por tipo"""
+        return {
             'greeting': self.greetings,
             'farewell': self.farewells,
             'how_are_you': self.how_are_you_responses,
@@ -240,7 +230,14 @@ class DialogueManager:
             'negative_feedback': self.negative_feedback_responses,
             'gratitude': self.gratitude_responses
         }
-        
+    
+    def canned_responses(self) -> List[str]:
+        """Todas as respostas fixas (ex.: para pré-sintetizar o áudio)"""
+        return [response for responses in self._responses().values() for response in responses]
+    
+    def get_random_response(self, response_type: str) -> str:
+        """Retorna uma resposta aleatória do tipo especificado"""
+        responses = self._responses()
         if response_type in responses:
             return random.choice(responses[response_type])
         
@@ -261,17 +258,7 @@ class DialogueManager:
     
     def is_social_interaction(self, text: str) -> bool:
         """Verifica se é uma interação social (cumprimento, despedida, etc.)"""
-        return (self.is_greeting(text) or 
-                self.is_farewell(text) or 
-                self.is_how_are_you(text) or 
-                self.is_how_are_you_answer(text) or
-                self.is_help_request(text) or
-                self.is_function_question(text) or
-                self.is_joke_request(text) or
-                self.is_positive_feedback(text) or
-                self.is_negative_feedback(text) or
-                self.is_gratitude(text)
-                )
+        return self.matcher.matches_any(text, 'social.')
 
     
     def handle_social_interaction(self, text: str, is_farewell: bool = False) -> str:
@@ -0,0 +1,91 @@
+"""
+Módulo de reconhecimento de intenções por palavras-chave
+"""
+import re
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_END = ""  # marca de fim de palavra-chave no trie (nunca é um token)
+
+
+class IntentMatcher:
+    """Casa as listas de palavras-chave de todos os módulos numa única passada.
+
+    As palavras-chave são compiladas em um trie de tokens. Cada nó final guarda
+    as intenções que terminam ali, então uma varredura do texto retorna o conjunto
+    completo de intenções encontradas, inclusive quando palavras-chave de
+    intenções diferentes se sobrepõem. O casamento respeita limites de palavra,
+    como o antigo re.search(rf"\\b{palavra}\\b", texto).
+    """
+
+    def __init__(self, memo_size: int = 128):
+        self._trie = {}
+        self._intents = set()
+        self._lock = threading.Lock()  # os módulos registram palavras-chave em threads paralelas no boot
+        # Vários is_* são chamados em sequência com o mesmo texto: só o primeiro varre
+        self._match_cached = lru_cache(maxsize=memo_size)(self._scan)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Divide o texto em palavras e sinais de pontuação, em minúsculas"""
+        return _TOKEN_RE.findall(text.lower())
+
+    def add(self, intent: str, keywords: Iterable[str]):
+        """Registra as palavras-chave de uma intenção"""
+        with self._lock:
+            for keyword in keywords:
+                tokens = self.tokenize(keyword)
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_END, set()).add(intent)
+            self._intents.add(intent)
+            self._match_cached.cache_clear()
+
+    def register(self, namespace: str, keywords_by_intent: Dict[str, Iterable[str]]):
+        """Registra várias intenções com prefixo comum (ex.: 'social.greeting')"""
+        for intent, keywords in keywords_by_intent.items():
+            self.add(f"{namespace}.{intent}", keywords)
+
+    def _scan(self, text: str) -> Mapping[str, int]:
+        tokens = self.tokenize(text)
+        found = {}
+        for start in range(len(tokens)):
+            node = self._trie
+            for length, token in enumerate(tokens[start:], 1):
+                node = node.get(token)
+                if node is None:
+                    break
+                for intent in node.get(_END, ()):
+                    if length > found.get(intent, 0):
+                        found[intent] = length
+        return MappingProxyType(found)
+
+    def scores(self, text: str) -> Mapping[str, int]:
+        """Retorna intenção -> tamanho (em tokens) da maior palavra-chave encontrada"""
+        return self._match_cached(text)
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Retorna todas as intenções cujas palavras-chave aparecem no texto"""
+        return frozenset(self._match_cached(text))
+
+    def matches(self, text: str, intent: str) -> bool:
+        """Verifica se o texto contém alguma palavra-chave da intenção"""
+        return intent in self._match_cached(text)
+
+    def matches_any(self, text: str, prefix: str) -> bool:
+        """Verifica se o texto casa alguma intenção do namespace (ex.: 'social.')"""
+        return any(intent.startswith(prefix) for intent in self._match_cached(text))
+
+    @property
+    def intents(self) -> FrozenSet[str]:
+        return frozenset(self._intents)
+
+
+# Instância compartilhada por todos os módulos do bot
+default_matcher = IntentMatcher()
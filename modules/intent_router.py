@@ -0,0 +1,73 @@
+"""
+Módulo de roteamento de intenções por pontuação
+"""
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+from modules.intent_matcher import IntentMatcher
+
+
+class Route:
+    """Uma rota: intenções que a ativam e o handler que gera a resposta"""
+
+    __slots__ = ('name', 'intents', 'handler', 'priority', 'fallback')
+
+    def __init__(self, name: str, intents: Iterable[str], handler: Callable[[str], Optional[str]],
+                 priority: int, fallback: bool = False):
+        self.name = name
+        self.intents = tuple(intents)
+        self.handler = handler
+        self.priority = priority
+        self.fallback = fallback
+
+
+class IntentRouter:
+    """Escolhe o handler de uma entrada numa única varredura do IntentMatcher.
+
+    Cada rota recebe como pontuação o tamanho da maior palavra-chave casada entre
+    suas intenções; empates são decididos pela prioridade (menor vence). Rotas
+    de fallback entram sempre, com pontuação zero. O handler vencedor é chamado
+    primeiro; se devolver None, tenta-se o próximo candidato.
+    """
+
+    def __init__(self, matcher: IntentMatcher, debug: bool = False):
+        self.matcher = matcher
+        self.debug = debug
+        self.routes: List[Route] = []
+
+    def add_route(self, name: str, intents: Iterable[str], handler: Callable[[str], Optional[str]],
+                  priority: int, fallback: bool = False):
+        """Registra uma rota"""
+        self.routes.append(Route(name, intents, handler, priority, fallback))
+
+    def rank(self, text: str) -> List[Tuple[int, Route]]:
+        """Retorna as rotas candidatas ordenadas da mais para a menos provável"""
+        scores = self.matcher.scores(text)
+        candidates = []
+        for route in self.routes:
+            score = max((scores.get(intent, 0) for intent in route.intents), default=0)
+            if score > 0 or route.fallback:
+                candidates.append((score, route))
+        candidates.sort(key=lambda item: (-item[0], item[1].priority))
+        return candidates
+
+    def route(self, text: str, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Envia o texto ao melhor handler, caindo para o próximo quando não há resposta.
+
+        As rotas nomeadas em exclude são ignoradas.
+        """
+        start = time.perf_counter()
+        candidates = [(score, route) for score, route in self.rank(text) if route.name not in exclude]
+        rank_time = time.perf_counter() - start
+        if self.debug:
+            ranking = ", ".join(f"{route.name}={score}" for score, route in candidates) or "nenhuma"
+            print(f"🧭 DEBUG - Rotas candidatas: {ranking} ({rank_time * 1e6:.0f} µs)")
+
+        for score, route in candidates:
+            handler_start = time.perf_counter()
+            response = route.handler(text)
+            if self.debug:
+                status = "respondeu" if response is not None else "sem resposta"
+                print(f"🧭 DEBUG - Rota '{route.name}' {status} em {(time.perf_counter() - handler_start) * 1e3:.1f} ms")
+            if response is not None:
+                return response
+        return None
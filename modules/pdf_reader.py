@@ -3,24 +3,232 @@ Módulo para leitura e processamento de arquivos PDF
 """
 import os
 import re
-from typing import List, Dict, Optional
-import pdfplumber
-import pandas as pd
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
 from rapidfuzz import process, fuzz
 import logging
+from modules.schedule_cache import ScheduleCache
+from modules.schedule_store import ScheduleTable
+from modules.intent_matcher import IntentMatcher, default_matcher
+from modules.schedule_search import ScheduleSearchIndex, normalize_text
+from modules.schedule_timeline import ScheduleTimeline, WEEKDAYS, format_minutes
+from modules.phonetic import PhoneticIndex
+from modules.resource_usage import usage_since, usage_snapshot
 logging.getLogger("pdfminer").setLevel(logging.ERROR)
 
+# Versão do pipeline de limpeza das tabelas. Incremente sempre que
+# _extract_tables_from_pdfs mudar, para invalidar o cache em disco.
+CLEANING_VERSION = 2
+
+
+# Campos de cada linha usados na busca livre (search_in_content)
+SEARCH_FIELDS = ('disciplina', 'professor', 'sala', 'horario', 'dia')
+# Similaridade mínima (cosseno) para a busca livre considerar um resultado
+SEARCH_MIN_SCORE = 0.25
+# A busca livre só responde se esta fração das palavras da pergunta aparecer (com
+# tolerância a erros do STT) na disciplina, no professor ou na sala da linha: sem
+# isso, conversa fora do assunto ("qual a capital da frança") casava com disciplinas
+# por uma palavra só ("gestão de capital humano")
+SEARCH_MATCH_FIELDS = ('disciplina', 'professor', 'sala')
+SEARCH_MIN_COVERAGE = 0.6
+SEARCH_WORD_MIN_SCORE = 85
+# Score mínimo (rapidfuzz) para resolver o nome de um professor ou de uma sala
+PROFESSOR_MIN_SCORE = 70
+# Score mínimo (fuzz.ratio) de uma palavra da pergunta contra uma palavra do nome do professor
+PROFESSOR_WORD_MIN_SCORE = 80
+# Palavras das células sem professor definido ("PROFESSOR CONTRATADO", "A DEFINIR"):
+# essas células ficam fora do índice reverso de professores
+PROFESSOR_PLACEHOLDER_WORDS = {'contratado', 'contratada', 'contratar', 'definir', 'definido', 'vago', 'vaga'}
+ROOM_MIN_SCORE = 70
+COURSE_MIN_SCORE = 60
+# Palavras que sobram nas perguntas reversas e não fazem parte do nome procurado
+REVERSE_STOPWORDS = {
+    'que', 'quais', 'quem', 'professora', 'aulas', 'disciplinas', 'matérias', 'materias',
+    'dá', 'dão', 'leciona', 'ensina', 'ministra', 'tem', 'usa', 'ocupa', 'hoje',
+    'agora', 'acontecendo', 'próxima', 'proxima', 'próximas', 'proximas'
+}
+# Intenções que dependem do relógio: as respostas não entram no cache
+TIME_INTENTS = ('free_rooms', 'room_now', 'next_class')
+
+# Cursos conhecidos: código do arquivo (horario_<código>.pdf) -> nome completo
+COURSES = {
+    'cc': 'ciência da computação',
+    'ema': 'engenharia de materiais',
+    'emp': 'engenharia de produção',
+    'emt': 'engenharia de mecatrônica',
+    'tads': 'tecnologia em análise de desenvolvimento',
+    'tcn': 'tecnologia de construção naval'
+}
+
+
+def _cache_path(data_folder: str, cache_folder: Optional[str], store: str) -> str:
+    """Pasta do cache em disco das tabelas de um formato de armazenamento"""
+    return os.path.join(cache_folder or os.path.join(data_folder, ".cache"), store)
+
+
+def create_extraction_pool(data_folder: str = "data", workers: int = 1, store: str = "pandas",
+                           cache_folder: Optional[str] = None):
+    """Cria o pool de processos da extração, só se algum PDF não estiver no cache em disco.
+
+    Precisa ser chamado antes de o boot abrir outras threads: os processos são
+    criados com fork na hora, herdando os módulos já importados (numpy, rapidfuzz),
+    em vez de spawn, que reimporta tudo em cada processo. Quem chama passa o pool
+    ao PDFReader (executor) e o encerra depois da carga. Retorna None se não houver
+    o que extrair, se workers <= 1 ou se a plataforma não tiver fork.
+    """
+    import multiprocessing
+    workers = min(workers, os.cpu_count() or 1)
+    if workers <= 1 or not os.path.exists(data_folder) or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    if threading.active_count() > 1:
+        return None  # fork com outras threads vivas pode travar o filho
+    pdf_files = [os.path.join(data_folder, f) for f in os.listdir(data_folder) if f.endswith('.pdf')]
+    try:
+        cache = ScheduleCache(_cache_path(data_folder, cache_folder, store.lower()), CLEANING_VERSION)
+        pending = [path for path in pdf_files if not cache.is_fresh(path)]
+    except OSError:
+        pending = pdf_files
+    if not pending:
+        return None
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                       mp_context=multiprocessing.get_context("fork"))
+        # Com fork, o primeiro submit cria todos os processos: força isso agora
+        executor.submit(os.getpid).result()
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ Extração paralela indisponível ({e})")
+        return None
+    return executor
+
 
 class PDFReader:
     """Gerenciador de leitura de PDFs"""
+
+    # Palavras-chave de cada tipo de pergunta, compiladas no IntentMatcher
+    KEYWORDS = {
+        'horario': [
+            'horário','horario','qual o horário', 'qual horário', 'horário da aula', 'horário da disciplina',
+            'horário da matéria', 'horário da turma', 'horário do curso', 'qual o horário da aula de', 'qual o horário da disciplina de','qual o horário da matéria de', 
+            'qual o horário da turma de', 'qual é o horário',  'qual é o horário da aula', 'qual é o horário da disciplina', 'qual é o horário da matéria', 
+            'qual é o horário da turma', 'qual é o horário do curso', 'horário de aula', 'horário de disciplina', 'horário de matéria', 
+            'horário de turma', 'horário de curso', 'qual é o horário da disciplina de','qual é o horário da matéria de', 'qual é o horário da turma de'
+        ],
+        'professor': [
+            'professor de','professor da', 'professor do','qual o professor', 'qual o professor da aula', 'qual o professor da disciplina', 'qual é o professor', 'qual professor', 'que professor', 'qual o professor da matéria', 'professor da aula de', 'professor da disciplina de', 'professor da matéria de', 'professor da turma de'
+        ],
+        'sala': [
+            'sala', 'qual a sala', 'qual a sala da aula', 'qual a sala da disciplina', 'qual é a sala', 'qual sala', 'que sala', 'sala da aula', 
+            'sala da disciplina', 'sala da matéria', 'sala da turma', 'qual a sala da matéria', 'sala da aula de', 
+            'sala da disciplina de', 'sala da matéria de', 'sala da turma de'
+        ],
+        'locate_professor': [
+            'onde está o professor', 'onde está a professora', 'onde fica o professor',
+            'onde fica a professora', 'localização do professor', 'localização da professora',
+            'onde encontro o professor', 'onde encontro a professora'
+        ],
+        'professor_classes': [
+            'o que o professor', 'o que a professora', 'quais aulas o professor', 'quais aulas a professora',
+            'aulas do professor', 'aulas da professora', 'disciplinas do professor', 'disciplinas da professora',
+            'matérias do professor', 'matérias da professora', 'professor dá', 'professora dá',
+            'professor leciona', 'professora leciona', 'professor ensina', 'professora ensina',
+            'dá aula', 'dá aulas'
+        ],
+        'room_now': [
+            'agora na sala', 'na sala agora', 'acontecendo na sala', 'tem aula na sala agora',
+            'livre agora', 'vazia agora', 'ocupada agora'
+        ],
+        'next_class': [
+            'próxima aula', 'proxima aula', 'próximas aulas', 'proximas aulas', 'próxima disciplina'
+        ],
+        'free_rooms': [
+            'salas livres', 'sala livre', 'salas vazias', 'sala vazia', 'salas disponíveis',
+            'sala disponível', 'salas desocupadas', 'sala desocupada', 'salas estão livres',
+            'sala está livre', 'salas estão vazias', 'sala está vazia', 'salas estão disponíveis'
+        ],
+        'room_classes': [
+            'aula tem na sala', 'aulas tem na sala', 'aula na sala', 'aulas na sala', 'aulas da sala',
+            'o que tem na sala', 'quem usa a sala', 'ocupa a sala'
+        ],
+    }
     
-    def __init__(self, data_folder: str = "data"):
+    def __init__(self, data_folder: str = "data", cache_folder: Optional[str] = None, use_cache: bool = True,
+                 match_workers: int = 1, lazy: bool = False, memory_budget_mb: Optional[float] = None,
+                 workers: int = 1, store: str = "pandas", answer_cache_size: int = 256,
+                 matcher: Optional[IntentMatcher] = None,
+                 clock: Optional[Callable[[], Tuple[int, int]]] = None, executor=None):
+        """
+        Args:
+            executor: Pool de processos já criado (create_extraction_pool) para a
+                extração paralela; sem ele, workers > 1 cria um pool próprio
+            clock: Função que retorna (dia da semana, minutos desde meia-noite) para
+                as perguntas de "agora"/"próxima aula" (padrão: relógio do sistema)
+            answer_cache_size: Quantidade de respostas mantidas no cache LRU (0 = desligado)
+            store: Formato das tabelas em pdf_contents - "pandas" (DataFrame) ou
+                "compact" (ScheduleTable, sem importar pandas)
+            workers: Número de processos para extrair PDFs em paralelo no boot (1 = sequencial;
+                limitado ao número de núcleos)
+            lazy: Modo fragmentado - no boot só lê o manifesto de cursos e as linhas dos
+                índices globais (cabeçalhos do cache em disco); o índice de cada curso é
+                montado dessas linhas na primeira pergunta que o usar, sem carregar a tabela
+            memory_budget_mb: Limite de memória das tabelas carregadas mais os índices de
+                todos os cursos (busca livre, reversos, linha do tempo); ao exceder, as
+                tabelas usadas há mais tempo são descarregadas (None = sem limite)
+        """
         self.data_folder = data_folder
+        self.matcher = matcher or default_matcher
+        self.matcher.register('pdf', self.KEYWORDS)
+        self.clock = clock or self._system_clock
+        self.match_workers = match_workers  # threads do rapidfuzz.cdist (-1 = todos os núcleos)
+        self.lazy = lazy
+        self.workers = max(1, min(workers, os.cpu_count() or 1))  # mais processos que núcleos só atrasa
+        self.executor = executor
+        self.store = store.lower() if store.lower() in ("pandas", "compact") else "pandas"
+        self.memory_budget = memory_budget_mb * 1024 * 1024 if memory_budget_mb else None
+        self.manifest = {}  # código do curso -> caminho do PDF
         self.pdf_contents = {}
+        self.course_index = {}
+        self.load_timings = {}  # código -> parede/CPU/ΔRSS da última carga (e origem: pdf ou cache)
+        self.course_phonetic = PhoneticIndex(COURSES.values())  # chave fonética -> nome do curso
+        self._shard_sizes = OrderedDict()  # código -> bytes estimados, em ordem de uso (LRU)
+        self._course_rows = {}  # código -> linhas dos índices globais (mantidas mesmo no modo lazy)
+        self._index_bytes = 0  # bytes estimados dos índices globais, contados no limite de memória
+        self._shard_lock = threading.RLock()
+        self._file_stamps = {}  # caminho -> (mtime_ns, tamanho) da última versão indexada
+        self._watch_stop = threading.Event()
+        self._watch_thread = None
+        self.answer_cache_size = answer_cache_size
+        self.answer_cache_hits = 0
+        self.answer_cache_misses = 0
+        self._answer_cache = OrderedDict()  # (intenção, pergunta normalizada) -> resposta
+        self._answer_generation = 0
+        self._answer_lock = threading.Lock()
+        self.search_index = None
+        self.reverse_index = None  # {'professor': {nome: linhas}, 'sala': {sala: linhas}}
+        self.timeline = None  # intervalos por dia/sala/curso (ScheduleTimeline)
+        self.cache = None
+        if use_cache and os.path.exists(self.data_folder):
+            try:
+                self.cache = ScheduleCache(_cache_path(self.data_folder, cache_folder, self.store), CLEANING_VERSION)
+            except OSError as e:
+                print(f"⚠️ Cache de PDFs desabilitado: {e}")
         self.load_pdfs()
     
+    @staticmethod
+    def _course_key(pdf_file: str) -> str:
+        """Extrai o código do curso do nome do arquivo"""
+        if "horario_" in pdf_file:
+            return pdf_file.replace("horario_", "").split(".")[0]
+        return pdf_file.split(".")[0]
+
     def load_pdfs(self):
-        """Carrega todos os PDFs da pasta data"""
+        """Carrega todos os PDFs da pasta data (ou só o manifesto, no modo lazy)"""
         if not os.path.exists(self.data_folder):
             print(f"⚠️ Pasta {self.data_folder} não encontrada")
             return
@@ -32,50 +240,604 @@ class PDFReader:
             return
         
         for pdf_file in pdf_files:
-            try:
-                file_path = os.path.join(self.data_folder, pdf_file)
-                if "horario_" in pdf_file:
-                    key = pdf_file.replace("horario_", "").split(".")[0]
+            self.manifest[self._course_key(pdf_file)] = os.path.join(self.data_folder, pdf_file)
+        self._file_stamps = {path: self._file_stamp(path) for path in self.manifest.values()}
+        self.course_phonetic = PhoneticIndex(self.course_names().values())
+
+        if self.lazy:
+            print(f"📇 Manifesto com {len(self.manifest)} cursos (carregamento sob demanda)")
+        elif self.workers > 1 or self.executor is not None:
+            self._load_courses_parallel(list(self.manifest))
+        else:
+            for code in self.manifest:
+                self._load_course(code)
+
+        self._rebuild_indexes()
+        if self.cache:
+            self.cache.prune(pdf_files)
+
+    @staticmethod
+    def _file_stamp(path: str):
+        """Retorna (mtime_ns, tamanho) do arquivo ou None se ele sumiu"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_changed(self, settle_seconds: float = 2.0) -> bool:
+        """Reindexa só os PDFs adicionados ou alterados e descarta os removidos.
+
+        As novas tabelas são extraídas e indexadas fora da trava; depois os
+        dicionários são trocados de uma vez, então perguntas em andamento
+        sempre enxergam o índice antigo ou o novo, nunca um estado parcial.
+        Arquivos modificados há menos de settle_seconds (ainda sendo copiados)
+        ficam para a próxima verificação. Retorna True se algo mudou.
+        """
+        if not os.path.exists(self.data_folder):
+            return False
+
+        now_ns = time.time_ns()
+        manifest = {}
+        stamps = {}
+        for pdf_file in os.listdir(self.data_folder):
+            if not pdf_file.endswith('.pdf'):
+                continue
+            path = os.path.join(self.data_folder, pdf_file)
+            stamp = self._file_stamp(path)
+            if stamp is None:
+                continue
+            manifest[self._course_key(pdf_file)] = path
+            stamps[path] = stamp
+
+        changed = [code for code, path in manifest.items() if self._file_stamps.get(path) != stamps[path]]
+        removed = [code for code in self.manifest if code not in manifest]
+        if not changed and not removed:
+            return False
+
+        loaded = {}
+        reindexed = []
+        for code in changed:
+            path = manifest[code]
+            if now_ns - stamps[path][0] < settle_seconds * 1e9:
+                # Ainda sendo escrito: mantém a versão anterior (ou ignora, se for novo)
+                if self._file_stamps.get(path) is None:
+                    del manifest[code]
+                    del stamps[path]
                 else:
-                    key = pdf_file.split(".")[0]
-                content = self._extract_tables_from_pdfs(file_path)
-                self.pdf_contents[key] = content
-                print(f"✅ PDF carregado: {pdf_file}")
+                    stamps[path] = self._file_stamps[path]
+                continue
+            if not self.lazy:
+                try:
+                    content = self._load_table(path)
+                    loaded[code] = (content, self._build_course_index(content))
+                except Exception as e:
+                    print(f"❌ Erro ao recarregar {os.path.basename(path)}: {e}")
+                    if self._file_stamps.get(path) is None:
+                        del manifest[code]
+                        del stamps[path]
+                    else:
+                        stamps[path] = self._file_stamps[path]  # tenta de novo na próxima verificação
+                    continue
+            # No modo lazy basta descartar a versão antiga; as linhas novas são lidas
+            # em _rebuild_indexes e o índice do curso, na próxima pergunta
+            reindexed.append(code)
+
+        with self._shard_lock:
+            keep = [c for c in self.course_index if c in manifest and c not in reindexed]
+            pdf_contents = {c: self.pdf_contents[c] for c in keep if c in self.pdf_contents}
+            course_index = {c: self.course_index[c] for c in keep}
+            shard_sizes = OrderedDict((c, size) for c, size in self._shard_sizes.items() if c in course_index)
+            for code, (content, index) in loaded.items():
+                pdf_contents[code] = content
+                course_index[code] = index
+                shard_sizes[code] = self._estimate_size(content, index)
+            self.manifest = manifest
+            self.course_phonetic = PhoneticIndex(self.course_names().values())
+            self.pdf_contents = pdf_contents
+            self.course_index = course_index
+            self._shard_sizes = shard_sizes
+            self._file_stamps = stamps
+            self._evict_shards()
+        if reindexed or removed:
+            for code in reindexed + removed:
+                self._course_rows.pop(code, None)
+            self._rebuild_indexes()
+            self.invalidate_answers()
+
+        for code in removed:
+            print(f"🗑️ Curso {code} removido do índice")
+        for code in reindexed:
+            print(f"🔄 Curso {code} reindexado")
+        if self.cache:
+            self.cache.prune(os.path.basename(path) for path in manifest.values())
+        return bool(reindexed or removed)
+
+    def start_watching(self, interval: float = 5.0):
+        """Inicia thread que verifica a pasta de dados a cada intervalo (polling de mtime)"""
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        self._watch_stop.clear()
+
+        def watch_loop():
+            while not self._watch_stop.wait(interval):
+                try:
+                    self.reload_changed()
+                except Exception as e:
+                    print(f"❌ Erro ao verificar a pasta {self.data_folder}: {e}")
+
+        self._watch_thread = threading.Thread(target=watch_loop, daemon=True)
+        self._watch_thread.start()
+        print(f"👀 Monitorando {self.data_folder} a cada {interval:g}s")
+
+    def stop_watching(self):
+        """Para a verificação periódica da pasta de dados"""
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join(timeout=1.0)
+            self._watch_thread = None
+
+    def _load_table(self, file_path: str, stats: Optional[dict] = None):
+        """Lê a tabela limpa de um PDF, usando o cache em disco quando possível.
+
+        Em stats ficam as estatísticas da extração e a origem ('pdf' ou 'cache').
+        """
+        pdf_file = os.path.basename(file_path)
+        stats = {} if stats is None else stats
+        content = self.cache.get(file_path) if self.cache else None
+        if content is None:
+            content = self._extract_tables_from_pdfs(file_path, stats, self.store)
+            self._cache_table(file_path, content)
+            stats['source'] = 'pdf'
+            print(f"✅ PDF carregado: {pdf_file}{self._format_stats(stats)}")
+        else:
+            stats['source'] = 'cache'
+            print(f"⚡ PDF carregado do cache: {pdf_file}")
+        return content
+
+    def _cache_table(self, file_path: str, content):
+        """Grava no cache em disco a tabela e, no cabeçalho, as linhas dos índices globais"""
+        if self.cache:
+            code = self._course_key(os.path.basename(file_path))
+            self.cache.put(file_path, content, self._search_rows(code, content))
+
+    def _record_load(self, code: str, usage: dict, stats: dict):
+        """Guarda o custo da carga de um curso para o relatório de inicialização"""
+        usage['source'] = stats.get('source', 'pdf')
+        if 'rows' in stats:
+            usage['rows'] = stats['rows']
+            usage['pages'] = stats['pages']
+        self.load_timings[code] = usage
+
+    def _load_courses_parallel(self, codes: List[str]):
+        """Extrai em um pool de processos os PDFs que não estão no cache em disco"""
+        loaded = {}
+        pending = {}
+        usages = {}  # código -> (medição iniciada, estatísticas), fechada após indexar
+        for code in codes:
+            path = self.manifest[code]
+            start = usage_snapshot()
+            content = self.cache.get(path) if self.cache else None
+            if content is None:
+                pending[code] = path
+            else:
+                print(f"⚡ PDF carregado do cache: {os.path.basename(path)}")
+                loaded[code] = content
+                usages[code] = (start, {'source': 'cache'})
+
+        if pending:
+            from concurrent.futures import as_completed
+            try:
+                with self._extraction_pool(len(pending)) as executor:
+                    futures = {
+                        executor.submit(PDFReader._extract_with_stats, path, self.store): code
+                        for code, path in pending.items()
+                    }
+                    for future in as_completed(futures):
+                        code = futures[future]
+                        pdf_file = os.path.basename(pending[code])
+                        start = usage_snapshot()
+                        try:
+                            content, stats = future.result()
+                        except Exception as e:
+                            print(f"❌ Erro ao carregar {pdf_file}: {e}")
+                            continue
+                        self._cache_table(pending[code], content)
+                        print(f"✅ PDF carregado: {pdf_file}{self._format_stats(stats)}")
+                        loaded[code] = content
+                        stats['source'] = 'pdf'
+                        usages[code] = (start, stats)
+            except (OSError, RuntimeError) as e:
+                # Sem suporte a processos (ex.: sandbox); extrai no processo atual
+                print(f"⚠️ Extração paralela indisponível ({e}), carregando sequencialmente")
+                for code in pending:
+                    if code not in loaded:
+                        self._load_course(code)
+
+        # Mantém a ordem do manifesto, independente da ordem de término dos processos
+        for code in codes:
+            if code in loaded and self._store_course(code, loaded[code]):
+                start, stats = usages[code]
+                usage = usage_since(start)
+                # A extração rodou no processo filho: soma a parede/CPU medidas lá;
+                # a ΔRSS é só a deste processo (tabela recebida + índices)
+                usage['wall_s'] = round(usage['wall_s'] + stats.get('seconds', 0.0), 4)
+                usage['cpu_s'] = round(usage['cpu_s'] + stats.get('cpu_seconds', 0.0), 4)
+                self._record_load(code, usage, stats)
+
+    @contextmanager
+    def _extraction_pool(self, pending: int):
+        """Pool recebido no construtor (continua aberto) ou um pool próprio, encerrado ao sair"""
+        if self.executor is not None:
+            yield self.executor
+            return
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # fork() com outras threads vivas (boot concorrente do bot) pode travar o filho;
+        # o bot evita o spawn criando o pool antes das threads (create_extraction_pool)
+        context = multiprocessing.get_context("spawn") if threading.active_count() > 1 else None
+        with ProcessPoolExecutor(max_workers=min(self.workers, pending), mp_context=context) as executor:
+            yield executor
+
+    def _load_course(self, code: str) -> bool:
+        """Carrega o índice de um curso do manifesto.
+
+        No modo lazy ele é montado com as linhas já lidas para os índices globais,
+        sem ler a tabela de novo; nos outros casos vem da tabela (cache ou PDF).
+        """
+        with self._shard_lock:
+            start = usage_snapshot()
+            rows = self._course_rows.get(code) if self.lazy else None
+            if rows is not None:
+                self._add_shard(code, None, self._index_from_rows(rows))
+                self._record_load(code, usage_since(start), {'source': 'index'})
+                return True
+            stats = {}
+            try:
+                content = self._load_table(self.manifest[code], stats)
+            except Exception as e:
+                print(f"❌ Erro ao carregar {os.path.basename(self.manifest[code])}: {e}")
+                return False
+            stored = self._store_course(code, content)
+            if stored:
+                self._record_load(code, usage_since(start), stats)
+            return stored
+
+    def _store_course(self, code: str, content) -> bool:
+        """Indexa a tabela de um curso e a registra na LRU"""
+        with self._shard_lock:
+            try:
+                index = self._build_course_index(content)
             except Exception as e:
-                print(f"❌ Erro ao carregar {pdf_file}: {e}")
+                print(f"❌ Erro ao indexar {os.path.basename(self.manifest[code])}: {e}")
+                return False
+            self._add_shard(code, content, index)
+            return True
+
+    def _add_shard(self, code: str, content, index: dict):
+        """Registra a tabela (None no modo lazy) e o índice de um curso na LRU"""
+        with self._shard_lock:
+            if content is not None:
+                self.pdf_contents[code] = content
+            self.course_index[code] = index
+            self._shard_sizes[code] = self._estimate_size(content, index)
+            self._shard_sizes.move_to_end(code)
+            self._evict_shards(keep=code)
+
+    @staticmethod
+    def _estimate_size(df, index: dict) -> int:
+        """Estima em bytes a memória ocupada pela tabela e pelo índice de um curso.
+
+        Sem a tabela (modo lazy) as linhas do índice são as dos índices globais,
+        já contadas em _index_bytes; só as listas por disciplina entram na conta.
+        """
+        if df is None:
+            size = 0
+        elif isinstance(df, ScheduleTable):
+            size = df.memory_usage()
+        else:
+            size = int(df.memory_usage(deep=True).sum())
+        for name, rows in index['rows'].items():
+            size += sys.getsizeof(name) * 2 + sys.getsizeof(rows)
+            if df is not None:
+                for row in rows:
+                    size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+        return size
+
+    def _evict_shards(self, keep: Optional[str] = None):
+        """Descarrega os cursos menos usados enquanto o limite de memória for excedido"""
+        if not self.memory_budget:
+            return
+        while (sum(self._shard_sizes.values()) + self._index_bytes > self.memory_budget
+               and len(self._shard_sizes) > 1):
+            code = next(iter(self._shard_sizes))
+            if code == keep:
+                break
+            self._shard_sizes.pop(code)
+            self.pdf_contents.pop(code, None)
+            self.course_index.pop(code, None)
+            print(f"♻️ Curso {code} descarregado da memória")
+
+    def _get_course_index(self, code: str) -> Optional[dict]:
+        """Retorna o índice do curso, carregando-o sob demanda e marcando o uso na LRU"""
+        with self._shard_lock:
+            if code not in self.course_index:
+                if code not in self.manifest or not self._load_course(code):
+                    return None
+            self._shard_sizes.move_to_end(code)
+            return self.course_index[code]
+
+    def course_names(self) -> Dict[str, str]:
+        """Retorna código -> nome completo de todos os cursos do manifesto"""
+        names = {code: name for code, name in COURSES.items()}
+        for code in self.manifest:
+            names.setdefault(code, code)
+        return names
     
-    def _extract_tables_from_pdfs(self, pdf_path):
-        """Extrai tabelas e executa limpeza de um PDF e retorna como DataFrame"""
-        dataframe = None
+    def _search_rows(self, code: str, table) -> List[Dict[str, str]]:
+        """Converte a tabela de um curso em documentos da busca livre"""
+        def column(name):
+            return table[name] if name in table else [None] * len(table)
+
+        course = self.course_names().get(code, code)
+        rows = []
+        for disciplina, dia, horario, professor, sala in zip(
+            column('DISCIPLINA'), column('DIA'), column('HORÁRIO'), column('PROFESSOR(A)'), column('SALA')
+        ):
+            if not self._cell(disciplina):
+                continue
+            rows.append({
+                'code': code,
+                'curso': course,
+                'disciplina': self._cell(disciplina).lower(),
+                'dia': self._cell(dia).lower(),
+                'horario': self._cell(horario),
+                'professor': self._cell(professor),
+                'sala': self._cell(sala),
+            })
+        return rows
+
+    def _rebuild_indexes(self):
+        """Recria, com as linhas de todos os cursos, o índice TF-IDF da busca livre,
+        os índices reversos de professor e de sala e a linha do tempo das aulas.
+
+        Roda no boot e no recarregamento, nunca durante uma pergunta. As linhas de
+        cada curso ficam em _course_rows e só são lidas de novo quando o curso muda.
+        Sem a tabela carregada (modo lazy) elas vêm do cabeçalho do cache em disco;
+        só sem cache a tabela é extraída, e descartada logo depois.
+        """
+        for code, path in list(self.manifest.items()):
+            if code in self._course_rows:
+                continue
+            table = self.pdf_contents.get(code)
+            rows = self.cache.get_rows(path) if table is None and self.cache else None
+            if rows is None:
+                if table is None:
+                    try:
+                        table = self._load_table(path)
+                    except Exception as e:
+                        print(f"❌ Erro ao indexar {os.path.basename(path)} para busca: {e}")
+                        continue
+                rows = self._search_rows(code, table)
+            self._course_rows[code] = rows
+        rows = [row for code in self.manifest for row in self._course_rows.get(code, [])]
+        search_index = ScheduleSearchIndex.from_rows(rows, SEARCH_FIELDS)
+        reverse_index = self._build_reverse_index(rows)
+        timeline = ScheduleTimeline(rows)
+        index_bytes = self._estimate_index_size(rows, search_index, reverse_index, timeline)
+        if self.memory_budget and index_bytes > self.memory_budget:
+            print(f"⚠️ Índices dos horários ({index_bytes / 1024 / 1024:.2f} MB) passam do limite de memória: "
+                  f"só a tabela em uso fica carregada")
+        with self._shard_lock:
+            self.search_index, self.reverse_index, self.timeline = search_index, reverse_index, timeline
+            self._index_bytes = index_bytes
+            self._evict_shards()
+
+    @staticmethod
+    def _estimate_index_size(rows: List[Dict[str, str]], search_index: ScheduleSearchIndex,
+                             reverse_index: dict, timeline: ScheduleTimeline) -> int:
+        """Estima em bytes a memória dos índices globais (as linhas são compartilhadas entre eles)"""
+        size = sys.getsizeof(rows) + search_index.memory_usage() + timeline.memory_usage()
+        for row in rows:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+        for keys in reverse_index.values():
+            size += sys.getsizeof(keys) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in keys.items())
+        return size
+
+    @staticmethod
+    def _build_reverse_index(rows: List[Dict[str, str]]) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+        """Monta os índices invertidos professor -> linhas e sala -> linhas.
+
+        As chaves são normalizadas (minúsculas, sem acentos e pontuação), então
+        "LAB.INF 201" e "Lab. Inf 201" caem na mesma sala; células com duas salas
+        ("LAB INF 201/LIGNAV") entram nas duas. Professores ainda não definidos
+        ("PROFESSOR CONTRATADO") ficam de fora. As linhas são as mesmas da busca livre.
+        """
+        professors, rooms = {}, {}
+        for row in rows:
+            professor = normalize_text(row['professor'])
+            if professor and not PROFESSOR_PLACEHOLDER_WORDS.intersection(professor.split()):
+                professors.setdefault(professor, []).append(row)
+            for room in row['sala'].split('/'):
+                key = normalize_text(room)
+                if key:
+                    rooms.setdefault(key, []).append(row)
+        return {'professor': professors, 'sala': rooms}
+
+    def _get_reverse_index(self) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+        """Retorna os índices reversos (vazios se nenhum PDF foi indexado)"""
+        return self.reverse_index or {'professor': {}, 'sala': {}}
+
+    def _get_timeline(self) -> ScheduleTimeline:
+        """Retorna a linha do tempo das aulas (vazia se nenhum PDF foi indexado)"""
+        return self.timeline or ScheduleTimeline([])
+
+    @staticmethod
+    def _system_clock() -> Tuple[int, int]:
+        """Retorna (dia da semana, minutos desde meia-noite) do relógio do sistema"""
+        now = datetime.now()
+        return now.weekday(), now.hour * 60 + now.minute
+
+    @staticmethod
+    def _describe_row(row: Dict[str, str]) -> str:
+        """Descreve uma linha de horário em uma frase"""
+        parts = [f"{row['disciplina']} de {row['curso']}"]
+        if row['dia'] and row['horario']:
+            parts.append(f"{row['dia']} {row['horario'].replace(' - ', ' às ')}")
+        if row['professor']:
+            parts.append(f"com {row['professor']}")
+        if row['sala']:
+            parts.append(f"na sala {row['sala']}")
+        return ", ".join(parts)
+
+    def search_in_content(self, text: str, k: int = 3) -> str:
+        """Busca livre em todas as linhas de horário (disciplina, professor, sala e horário)"""
+        index = self.search_index
+        query = self.clear_text(text.lower()) or text
+        results = index.search(query, k) if index is not None else []
+        words = normalize_text(query).split()
+        results = [(score, row) for score, row in results
+                   if score >= SEARCH_MIN_SCORE and self._field_coverage(words, row) >= SEARCH_MIN_COVERAGE]
+        if not results:
+            return "Não encontrei nada sobre isso nos horários."
+        best_score = results[0][0]
+        found = [self._describe_row(row) for score, row in results if score >= best_score * 0.9]
+        if len(found) == 1:
+            return f"Encontrei: {found[0]}."
+        return "Encontrei: " + "; ".join(found) + "."
+
+    def _field_coverage(self, words: List[str], row: Dict[str, str]) -> float:
+        """Fração das palavras da pergunta presentes na disciplina, no professor ou na sala da linha"""
+        field_words = normalize_text(" ".join(row[field] for field in SEARCH_MATCH_FIELDS)).split()
+        if not words or not field_words:
+            return 0.0
+        scores = process.cdist(words, field_words, scorer=fuzz.ratio, dtype=np.float64, workers=self.match_workers)
+        return float((scores.max(axis=1) >= SEARCH_WORD_MIN_SCORE).mean())
+
+    @staticmethod
+    def _cell(value) -> str:
+        """Normaliza uma célula da tabela (None/NaN viram string vazia)"""
+        return value.strip() if isinstance(value, str) else ""
+
+    def _build_course_index(self, df) -> dict:
+        """Monta o índice de disciplinas de um curso para consultas sem pandas.
+
+        'names' guarda os nomes em minúsculas (na ordem da tabela) prontos para o
+        rapidfuzz, 'rows' mapeia cada nome para as linhas com horário, professor e sala
+        e 'phonetic' resolve nomes mal transcritos pela chave fonética, sem o rapidfuzz.
+        """
+        rows = {}
+        for disciplina, horario, professor, sala in zip(
+            df['DISCIPLINA'], df['HORÁRIO'], df['PROFESSOR(A)'], df['SALA']
+        ):
+            name = self._cell(disciplina).lower()
+            if not name:
+                continue
+            rows.setdefault(name, []).append({
+                'horario': self._cell(horario),
+                'professor': self._cell(professor),
+                'sala': self._cell(sala),
+            })
+        return {'names': list(rows), 'rows': rows, 'phonetic': PhoneticIndex(rows)}
+
+    @staticmethod
+    def _index_from_rows(rows: List[Dict[str, str]]) -> dict:
+        """Monta o mesmo índice de _build_course_index com as linhas da busca livre
+        de um curso (modo lazy); as linhas são compartilhadas com os índices globais"""
+        index_rows = {}
+        for row in rows:
+            index_rows.setdefault(row['disciplina'], []).append(row)
+        return {'names': list(index_rows), 'rows': index_rows, 'phonetic': PhoneticIndex(index_rows)}
+
+    @staticmethod
+    def _clean_discipline(name):
+        """Normaliza o nome de uma disciplina (algarismos romanos, vírgulas e espaços)"""
+        if not isinstance(name, str):
+            return name
+        name = re.sub(r"\bI\b", "1", name)
+        name = re.sub(r"\bII\b", "2", name)
+        name = re.sub(r"\bIII\b", "3", name)
+        name = re.sub(r"\bIV\b", "4", name)
+        name = re.sub(r"\bV\b", "5", name)
+        name = name.replace(",", "")
+        name = name.replace("  ", " ")
+        return name.strip()
+
+    @staticmethod
+    def _iter_schedule_rows(pdf_path, stats: Optional[dict] = None):
+        """Percorre as páginas do PDF uma a uma e gera as linhas limpas da tabela de horários.
+
+        O cabeçalho é a primeira linha com todas as células preenchidas. Nas páginas
+        seguintes só entram linhas com o mesmo número de colunas (continuação da
+        tabela); legendas e cabeçalhos repetidos são ignorados. Cada página é
+        liberada logo após ser processada, mantendo o pico de memória constante.
+        """
+        import pdfplumber  # só é necessário quando o PDF não está no cache em disco
+        header = None
+        start = time.perf_counter()
+        pages = rows = 0
         with pdfplumber.open(pdf_path) as pdf:
-            first_page = pdf.pages[0]
-            table = first_page.extract_table()
-
-            # Converte a tabela extraída em um DataFrame
-            df = pd.DataFrame(table)
-
-            # Encontra a primeira linha não vazia para definir os nomes das colunas
-            for i, row in df.iterrows():
-                if all(cell is not None and cell.strip() != '' for cell in row):
-                    df.columns = row  # Coloca a primeira linha valida como cabeçalho
-                    df = df.iloc[i + 1:]  # Remove as linhas acima do cabeçalho
-                    break
-
-            # Adiciona uma nova coluna 'SOURCE' com o nome do arquivo PDF
-            # df['ORIGEM'] = key
-
-            # Guarda o DataFrame em um dicionário com o nome do arquivo PDF como chave
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace(r"\bI\b", "1", regex=True)
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace(r"\bII\b", "2", regex=True)
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace(r"\bIII\b", "3", regex=True)
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace(r"\bIV\b", "4", regex=True)
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace(r"\bV\b", "5", regex=True)
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace(",", "")
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.replace("  ", " ", regex=True)
-            df['DISCIPLINA'] = df['DISCIPLINA'].str.strip()
-            dataframe = df
-
-        return dataframe
+            for page in pdf.pages:
+                try:
+                    table = page.extract_table() or []
+                finally:
+                    page.close()
+                pages += 1
+                for row in table:
+                    if header is None:
+                        if all(cell is not None and cell.strip() != '' for cell in row):
+                            header = row
+                        continue
+                    if len(row) != len(header) or row == header:
+                        continue
+                    record = dict(zip(header, row))
+                    if 'DISCIPLINA' in record:
+                        record['DISCIPLINA'] = PDFReader._clean_discipline(record['DISCIPLINA'])
+                    if isinstance(record.get('HORÁRIO'), str):
+                        record['HORÁRIO'] = record['HORÁRIO'].replace("–", "-")
+                    rows += 1
+                    yield record
+
+        if stats is not None:
+            elapsed = time.perf_counter() - start
+            stats.update({
+                'pages': pages,
+                'rows': rows,
+                'seconds': elapsed,
+                'pages_per_second': pages / elapsed if elapsed else 0.0,
+                'rows_per_second': rows / elapsed if elapsed else 0.0,
+            })
+        if header is None:
+            raise ValueError("cabeçalho da tabela de horários não encontrado")
+
+    @staticmethod
+    def _extract_tables_from_pdfs(pdf_path, stats: Optional[dict] = None, store: str = "pandas"):
+        """Extrai a tabela de horários de todas as páginas de um PDF.
+
+        Retorna um DataFrame (store="pandas") ou uma ScheduleTable (store="compact").
+        """
+        rows = PDFReader._iter_schedule_rows(pdf_path, stats)
+        if store == "compact":
+            return ScheduleTable.from_records(rows)
+        import pandas as pd
+        return pd.DataFrame.from_records(list(rows))
+
+    @staticmethod
+    def _extract_with_stats(pdf_path, store: str = "pandas"):
+        """Versão para o pool de processos: retorna (tabela, estatísticas com a CPU do filho)"""
+        stats = {}
+        cpu = time.thread_time()
+        content = PDFReader._extract_tables_from_pdfs(pdf_path, stats, store)
+        stats['cpu_seconds'] = time.thread_time() - cpu
+        return content, stats
+
+    @staticmethod
+    def _format_stats(stats: dict) -> str:
+        """Formata as estatísticas de extração de um PDF"""
+        if not stats:
+            return ""
+        return (f" ({stats['rows']} linhas, {stats['pages']} páginas em {stats['seconds']:.2f}s: "
+                f"{stats['rows_per_second']:.0f} linhas/s, {stats['pages_per_second']:.1f} páginas/s)")
 
     def clear_text(self, text: str) -> str:
         """Limpa o texto removendo espaços extras e caracteres especiais"""
@@ -98,69 +860,131 @@ class PDFReader:
         return text
         
 
+    def _detect_intent(self, question_lower: str) -> Optional[str]:
+        """Identifica o tipo de pergunta sobre horários (uma única varredura do texto)"""
+        intents = self.matcher.match(question_lower)
+        for intent in ('free_rooms', 'room_now', 'next_class', 'professor_classes', 'room_classes',
+                       'horario', 'professor', 'sala'):
+            if f"pdf.{intent}" in intents:
+                return intent
+        return None
+
+    @staticmethod
+    def _normalize_question(question_lower: str) -> str:
+        """Normalização barata usada como chave do cache de respostas"""
+        return " ".join(re.sub(r'[^\w\s]', '', question_lower).split())
+
     def answer_question(self, question: str) -> Optional[str]:
         """Responde uma pergunta baseada nos PDFs"""
         question_lower = question.lower()
         # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-        if self.is_horario_question(question_lower):
-            question_lower = self.clear_text(question_lower)
-            # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-            return self.response_horario_question(question_lower)
-        
-        elif self.is_qual_professor_question(question_lower):
-            question_lower = self.clear_text(question_lower)
-            # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-            return self.response_professor_question(question_lower)
-        
-        elif self.is_sala_question(question_lower):
-            question_lower = self.clear_text(question_lower)
-            # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-            return self.response_sala_question(question_lower)
-        
-        else:
+        intent = self._detect_intent(question_lower)
+        if intent is None:
             return "❌ Pergunta não reconhecida. Tente reformular novamente."
+        if intent in TIME_INTENTS:
+            # Dependem da hora atual: respondidas direto pela linha do tempo, sem cache
+            return self._answer_time_question(intent, question_lower)
+
+        key = (intent, self._normalize_question(question_lower))
+        with self._answer_lock:
+            if key in self._answer_cache:
+                self._answer_cache.move_to_end(key)
+                self.answer_cache_hits += 1
+                return self._answer_cache[key]
+            self.answer_cache_misses += 1
+            generation = self._answer_generation
+
+        original_lower = question_lower
+        question_lower = self.clear_text(question_lower)
+        # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
+        if (intent == 'professor_classes' and not self._find_professors(question_lower)
+                and self._find_course_code(original_lower)):
+            # "qual professor dá aula de cálculo 2 de produção": sem nome de professor e
+            # com um curso, é a pergunta direta (professor da disciplina), não a reversa
+            intent = 'professor'
+        if intent == 'horario':
+            answer = self.response_horario_question(question_lower)
+        elif intent == 'professor':
+            answer = self.response_professor_question(question_lower)
+        elif intent == 'professor_classes':
+            answer = self.response_professor_classes_question(question_lower)
+        elif intent == 'room_classes':
+            answer = self.response_room_classes_question(question_lower)
+        else:
+            answer = self.response_sala_question(question_lower)
+
+        with self._answer_lock:
+            # Não guarda respostas calculadas com dados que foram trocados no meio do caminho
+            if self.answer_cache_size > 0 and generation == self._answer_generation:
+                self._answer_cache[key] = answer
+                if len(self._answer_cache) > self.answer_cache_size:
+                    self._answer_cache.popitem(last=False)
+        return answer
+
+    def _answer_time_question(self, intent: str, question_lower: str) -> str:
+        """Responde perguntas de "agora"/"próxima aula" com a hora do relógio"""
+        day, minute = self.clock()
+        if intent == 'free_rooms':
+            return self.response_free_rooms_question(day, minute)
+        if intent == 'room_now':
+            return self.response_room_now_question(question_lower, day, minute)
+        return self.response_next_class_question(question_lower, day, minute)
+
+    def invalidate_answers(self):
+        """Descarta as respostas em cache (chamado quando alguma tabela muda)"""
+        with self._answer_lock:
+            self._answer_cache.clear()
+            self._answer_generation += 1
+
+    def get_cache_stats(self) -> dict:
+        """Retorna os contadores do cache de respostas"""
+        with self._answer_lock:
+            total = self.answer_cache_hits + self.answer_cache_misses
+            return {
+                'hits': self.answer_cache_hits,
+                'misses': self.answer_cache_misses,
+                'hit_rate': self.answer_cache_hits / total if total else 0.0,
+                'size': len(self._answer_cache),
+                'max_size': self.answer_cache_size,
+            }
 
 
 
     def is_horario_question(self, text: str) -> bool:
-        """Verifica se está perguntando como está"""
-        questions = [
-            'horário','horario','qual o horário', 'qual horário', 'horário da aula', 'horário da disciplina',
-            'horário da matéria', 'horário da turma', 'horário do curso', 'qual o horário da aula de', 'qual o horário da disciplina de','qual o horário da matéria de', 
-            'qual o horário da turma de', 'qual é o horário',  'qual é o horário da aula', 'qual é o horário da disciplina', 'qual é o horário da matéria', 
-            'qual é o horário da turma', 'qual é o horário do curso', 'horário de aula', 'horário de disciplina', 'horário de matéria', 
-            'horário de turma', 'horário de curso', 'qual é o horário da disciplina de','qual é o horário da matéria de', 'qual é o horário da turma de'
-        ]
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{question}\b", text_lower) for question in questions)
+        """Verifica se está perguntando o horário de uma disciplina"""
+        return self.matcher.matches(text, 'pdf.horario')
     
     def is_qual_professor_question(self, text: str) -> bool:
-        """Verifica se está perguntando como está"""
-        questions = [
-            'professor de','professor da', 'professor do','qual o professor', 'qual o professor da aula', 'qual o professor da disciplina', 'qual é o professor', 'qual professor', 'que professor', 'qual o professor da matéria', 'professor da aula de', 'professor da disciplina de', 'professor da matéria de', 'professor da turma de'
-        ]
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{question}\b", text_lower) for question in questions)
+        """Verifica se está perguntando o professor de uma disciplina"""
+        return self.matcher.matches(text, 'pdf.professor')
 
     def is_sala_question(self, text: str) -> bool:
-        """Verifica se está perguntando como está"""
-        questions = [
-            'sala', 'qual a sala', 'qual a sala da aula', 'qual a sala da disciplina', 'qual é a sala', 'qual sala', 'que sala', 'sala da aula', 
-            'sala da disciplina', 'sala da matéria', 'sala da turma', 'qual a sala da matéria', 'sala da aula de', 
-            'sala da disciplina de', 'sala da matéria de', 'sala da turma de'
-        ]
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{question}\b", text_lower) for question in questions)
+        """Verifica se está perguntando a sala de uma disciplina"""
+        return self.matcher.matches(text, 'pdf.sala')
             
+    def is_professor_classes_question(self, text: str) -> bool:
+        """Verifica se está perguntando quais aulas um professor dá"""
+        return self.matcher.matches(text, 'pdf.professor_classes')
+
+    def is_room_classes_question(self, text: str) -> bool:
+        """Verifica se está perguntando quais aulas acontecem numa sala"""
+        return self.matcher.matches(text, 'pdf.room_classes')
+
+    def is_room_now_question(self, text: str) -> bool:
+        """Verifica se está perguntando que aula acontece agora numa sala"""
+        return self.matcher.matches(text, 'pdf.room_now')
+
+    def is_next_class_question(self, text: str) -> bool:
+        """Verifica se está perguntando a próxima aula"""
+        return self.matcher.matches(text, 'pdf.next_class')
+
+    def is_free_rooms_question(self, text: str) -> bool:
+        """Verifica se está perguntando quais salas estão livres"""
+        return self.matcher.matches(text, 'pdf.free_rooms')
+
     def is_locate_professor_question(self, text: str) -> bool:
-        """Verifica se está perguntando como está"""
-        questions = [
-            'onde está o professor', 'onde está a professora', 'onde fica o professor',
-            'onde fica a professora', 'localização do professor', 'localização da professora',
-            'onde encontro o professor', 'onde encontro a professora'
-        ]
-        text_lower = text.lower().strip()
-        return any(re.search(rf"\b{question}\b", text_lower) for question in questions)
+        """Verifica se está perguntando onde encontrar um professor"""
+        return self.matcher.matches(text, 'pdf.locate_professor')
 
 
 
@@ -170,28 +994,87 @@ class PDFReader:
         return [" ".join(palavras[i:i+n]) for i in range(len(palavras)) for n in range(1, max_ngram+1) if i + n <= len(palavras)]
 
 
+    def _best_match(self, queries: List[str], choices: List[str]):
+        """Pontua todos os n-gramas contra todas as opções de uma vez.
+
+        Retorna (n-grama, opção, score) do maior fuzz.ratio da matriz. Em caso de
+        empate vence o primeiro n-grama e a primeira opção, como no antigo laço
+        de process.extractOne.
+        """
+        if not queries or not choices:
+            return "", "", 0
+        scores = process.cdist(queries, choices, scorer=fuzz.ratio, dtype=np.float64, workers=self.match_workers)
+        row, col = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        score = float(scores[row, col])
+        if score <= 0:
+            return "", "", 0
+        return queries[row], choices[col], score
+
+    def _resolve_keys(self, queries: List[str], keys: List[str], scorer, min_score: float) -> List[str]:
+        """Resolve por aproximação a chave de um índice reverso mencionada na pergunta.
+
+        Retorna todas as chaves empatadas com o maior score (ex.: dois professores
+        "Silva"), ou lista vazia se nenhuma atingir min_score.
+        """
+        if not queries or not keys:
+            return []
+        scores = process.cdist(queries, keys, scorer=scorer, dtype=np.float64, workers=self.match_workers)
+        best = scores.max(axis=0)
+        top = float(best.max())
+        if top < min_score:
+            return []
+        return [keys[i] for i in np.flatnonzero(best == top)]
+
+    @staticmethod
+    def _reverse_query(question: str) -> str:
+        """Remove da pergunta (já limpa) as palavras que não fazem parte do nome procurado"""
+        words = [word for word in question.split() if word.lower() not in REVERSE_STOPWORDS]
+        return normalize_text(" ".join(words))
+
+    @staticmethod
+    def _sort_rows(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Ordena linhas de horário por dia da semana e hora de início"""
+        def key(row):
+            day = WEEKDAYS.index(row['dia']) if row['dia'] in WEEKDAYS else len(WEEKDAYS)
+            return day, row['horario']
+        return sorted(rows, key=key)
+
+    @staticmethod
+    def _describe_slot(row: Dict[str, str], *fields: str) -> str:
+        """Descreve dia, horário e os campos extras (professor/sala) de uma linha"""
+        parts = []
+        if row['dia'] and row['horario']:
+            parts.append(f"{row['dia']} {row['horario'].replace(' - ', ' às ')}")
+        if 'sala' in fields and row['sala']:
+            parts.append(f"sala {row['sala']}")
+        if 'professor' in fields and row['professor']:
+            parts.append(f"com {row['professor']}")
+        return ", ".join(parts)
+
+    def _group_classes(self, rows: List[Dict[str, str]], *fields: str) -> str:
+        """Agrupa as linhas por disciplina e curso: 'física 1 de cc (segunda 7:00 às 9:40); ...'"""
+        groups = {}
+        for row in self._sort_rows(rows):
+            slot = self._describe_slot(row, *fields)
+            slots = groups.setdefault((row['disciplina'], row['curso']), [])
+            if slot and slot not in slots:
+                slots.append(slot)
+        parts = []
+        for (disciplina, curso), slots in groups.items():
+            parts.append(f"{disciplina} de {curso}" + (f" ({'; '.join(slots)})" if slots else ""))
+        return "; ".join(parts)
+
     def _search_course(self, question: str):
         """Procura o curso na pergunta e retorna o código, nome completo e palavra original"""
-        courses = {
-            'cc': 'ciência da computação',
-            'ema': 'engenharia de materiais',
-            'emp': 'engenharia de produção',
-            'emt': 'engenharia de mecatrônica',
-            'tads': 'tecnologia em análise de desenvolvimento',
-            'tcn': 'tecnologia de construção naval'
-        }
-        best_match = ""
-        best_score = 0
-        original_word = ""
-        palavras = self.gerar_combinacoes(question)
-        full_list = list(courses.values()) + list(courses.keys())
-        for palavra in palavras:
-            match, score, _ = process.extractOne(palavra, full_list, scorer=fuzz.ratio)
-            # print(f"🔍 DEBUG - Verificando palavra: '{palavra}' -> Match: '{match}' com score: {score}")
-            if score > best_score:
-                best_score = score
-                original_word = palavra
-                best_match = match
+        courses = self.course_names()
+        hit = self.course_phonetic.lookup(question)
+        if hit:
+            # Chave fonética exata: dispensa a varredura aproximada
+            original_word, best_match = hit
+            best_score = 100
+        else:
+            full_list = list(courses.values()) + list(courses.keys())
+            original_word, best_match, best_score = self._best_match(self.gerar_combinacoes(question), full_list)
         
         if best_score >= 40:
             # print(f"🔍 DEBUG - Melhor match encontrado: '{best_match}' com score: {best_score}")
@@ -204,82 +1087,177 @@ class PDFReader:
 
 
 
-    def response_horario_question(self, question: str) -> str:
-        """Responde perguntas sobre horários de disciplinas"""
-        best_match = [None, 0]
+    def _match_discipline(self, index: dict, question: str) -> Optional[str]:
+        """Retorna o nome normalizado da disciplina do curso que melhor casa com a pergunta"""
+        hit = index['phonetic'].lookup(question)
+        if hit:
+            return hit[1]
+        _, match, score = self._best_match(self.gerar_combinacoes(question), index['names'])
+        return match if score > 40 else None
+
+    def _lookup_discipline(self, question: str):
+        """Resolve curso e disciplina da pergunta e retorna (nome completo, disciplina, linhas)"""
         question_lower = question.lower()
         code, full_name, original_word = self._search_course(question)
-        # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-        if code and full_name:
-            question_lower = question_lower.replace(original_word, "", 1).strip()
-            palavras = self.gerar_combinacoes(question_lower)
-            list_lower = [x.lower() for x in self.pdf_contents[code]['DISCIPLINA'].unique().tolist()]
-            for palavra in palavras:
-                match = process.extractOne(palavra, list_lower, scorer=fuzz.ratio)
-                if match[1] > 40 and match[1] > best_match[1]:
-                    best_match = match
-
-            if best_match[0]:
-                df = self.pdf_contents[code]
-                result = df[df['DISCIPLINA'] == best_match[0].upper()]['HORÁRIO'].to_string(index=False)
-                time_start, time_end = result.split(" - ")
-                return f"O horário da disciplina {best_match[0]} de {full_name} começa às {time_start} e termina às {time_end}."
-            else:
-                return f"⚠️ Disciplina não encontrado na pergunta: {question}"
+        index = self._get_course_index(code) if code and full_name else None
+        if index is None:
+            return None, None, None
+        question_lower = question_lower.replace(original_word, "", 1).strip()
+        discipline = self._match_discipline(index, question_lower)
+        if not discipline:
+            return full_name, None, None
+        return full_name, discipline, index['rows'][discipline]
 
-        else:
+    @staticmethod
+    def _join_values(rows: List[Dict[str, str]], field: str) -> str:
+        """Junta os valores distintos de um campo das linhas de uma disciplina"""
+        values = list(dict.fromkeys(row[field] for row in rows))
+        return " e ".join(values)
+
+    def response_horario_question(self, question: str) -> str:
+        """Responde perguntas sobre horários de disciplinas"""
+        full_name, discipline, rows = self._lookup_discipline(question)
+        if not full_name:
             return f"⚠️ Curso não encontrado na pergunta: {question}"
-        
+        if not discipline:
+            return f"⚠️ Disciplina não encontrado na pergunta: {question}"
+
+        horarios = list(dict.fromkeys(row['horario'] for row in rows))
+        if len(horarios) == 1 and " - " in horarios[0]:
+            time_start, time_end = horarios[0].split(" - ", 1)
+            return f"O horário da disciplina {discipline} de {full_name} começa às {time_start} e termina às {time_end}."
+        intervals = " e das ".join(h.replace(" - ", " às ") for h in horarios)
+        return f"A disciplina {discipline} de {full_name} tem aulas das {intervals}."
+
     def response_professor_question(self, question: str) -> str:
         """Responde perguntas sobre professores de disciplinas"""
-        best_match = [None, 0]
-        question_lower = question.lower()
-        code, full_name, original_word = self._search_course(question)
-        # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-        if code and full_name:
-            question_lower = question_lower.replace(original_word, "", 1).strip()
-            palavras = self.gerar_combinacoes(question_lower)
-            list_lower = [x.lower() for x in self.pdf_contents[code]['DISCIPLINA'].unique().tolist()]
-            for palavra in palavras:
-                match = process.extractOne(palavra, list_lower, scorer=fuzz.ratio)
-                if match[1] > 40 and match[1] > best_match[1]:
-                    best_match = match
-            if best_match[0]:
-                df = self.pdf_contents[code]
-                result = df[df['DISCIPLINA'] == best_match[0].upper()]['PROFESSOR(A)'].to_string(index=False)
-                return f"O professor da disciplina {best_match[0]} de {full_name} é {result.strip()}"
-            else:
-                return f"⚠️ Disciplina não encontrado na pergunta: {question}"
-
-        else:
+        full_name, discipline, rows = self._lookup_discipline(question)
+        if not full_name:
             return f"⚠️ Curso não encontrado na pergunta: {question}"
+        if not discipline:
+            return f"⚠️ Disciplina não encontrado na pergunta: {question}"
+        return f"O professor da disciplina {discipline} de {full_name} é {self._join_values(rows, 'professor')}"
 
-        
     def response_sala_question(self, question: str) -> str:
         """Responde perguntas sobre salas de disciplinas"""
-        best_match = [None, 0]
-        question_lower = question.lower()
-        code, full_name, original_word = self._search_course(question)
-        # print(f"🔍 DEBUG - Pergunta processada: '{question_lower}'")
-        if code and full_name:
-            question_lower = question_lower.replace(original_word, "", 1).strip()
-            palavras = self.gerar_combinacoes(question_lower)
-            list_lower = [x.lower() for x in self.pdf_contents[code]['DISCIPLINA'].unique().tolist()]
-            for palavra in palavras:
-                match = process.extractOne(palavra, list_lower, scorer=fuzz.ratio)
-                # print(f"🔍 DEBUG - Verificando: {palavra} (match: {match[0]}, score {match[1]})")
-                if match[1] > 40 and match[1] > best_match[1]:
-                    best_match = match
-            if best_match[0]:
-                # print(f"🔍 DEBUG - Melhor match encontrado: {best_match[0]} com score {best_match[1]}")
-                df = self.pdf_contents[code]
-                result = df[df['DISCIPLINA'] == best_match[0].upper()]['SALA'].to_string(index=False)
-                return f"A sala da disciplina {best_match[0]} de {full_name} é {result.strip()}"
+        full_name, discipline, rows = self._lookup_discipline(question)
+        if not full_name:
+            return f"⚠️ Curso não encontrado na pergunta: {question}"
+        if not discipline:
+            return f"⚠️ Disciplina não encontrado na pergunta: {question}"
+        return f"A sala da disciplina {discipline} de {full_name} é {self._join_values(rows, 'sala')}"
+
+
+    def response_professor_classes_question(self, question: str) -> str:
+        """Responde quais disciplinas um professor dá (índice reverso professor -> aulas)"""
+        professors = self._get_reverse_index()['professor']
+        names = self._find_professors(question)
+        if not names:
+            return f"⚠️ Professor não encontrado na pergunta: {question}"
+        if len(names) > 1:
+            found = ", ".join(professors[name][0]['professor'] for name in names)
+            return f"Encontrei mais de um professor: {found}. Qual deles?"
+        rows = professors[names[0]]
+        return f"O professor {rows[0]['professor']} dá {self._group_classes(rows, 'sala')}."
+
+    def _find_professors(self, question: str) -> List[str]:
+        """Resolve os professores (chaves normalizadas) mencionados na pergunta já limpa.
+
+        O partial_ratio acha o nome em qualquer trecho da pergunta, inclusive em pedaços
+        de outras palavras ("processo" ~ "professor"); por isso cada professor achado
+        precisa ter uma palavra do nome parecida com uma palavra da pergunta.
+        """
+        professors = self._get_reverse_index()['professor']
+        query = self._reverse_query(question)
+        names = self._resolve_keys([query] if query else [], list(professors), fuzz.partial_ratio, PROFESSOR_MIN_SCORE)
+        words = query.split()
+        return [name for name in names
+                if process.cdist(words, name.split(), scorer=fuzz.ratio, dtype=np.float64,
+                                 workers=self.match_workers).max() >= PROFESSOR_WORD_MIN_SCORE]
+
+    def _find_rooms(self, question: str) -> List[str]:
+        """Resolve as salas (chaves normalizadas) mencionadas na pergunta já limpa"""
+        rooms = self._get_reverse_index()['sala']
+        query = self._reverse_query(question)
+        return self._resolve_keys(self.gerar_combinacoes(query), list(rooms), fuzz.ratio, ROOM_MIN_SCORE)
+
+    def _find_course_code(self, question_lower: str) -> Optional[str]:
+        """Procura o curso pelo código ("cc", "tads") ou, com score alto, pelo nome completo.
+
+        Recebe a pergunta antes do clear_text, que apagaria códigos de duas letras.
+        """
+        courses = self.course_names()
+        for word in normalize_text(question_lower).split():
+            if word in courses:
+                return word
+        query = self._reverse_query(self.clear_text(question_lower))
+        _, match, score = self._best_match(self.gerar_combinacoes(query), list(courses.values()))
+        if score < COURSE_MIN_SCORE:
+            return None
+        return next(code for code, name in courses.items() if name == match)
+
+    def response_room_classes_question(self, question: str) -> str:
+        """Responde quais aulas acontecem numa sala (índice reverso sala -> aulas)"""
+        rooms = self._get_reverse_index()['sala']
+        keys = self._find_rooms(question)
+        if not keys:
+            return f"⚠️ Sala não encontrada na pergunta: {question}"
+        rows = [row for key in keys for row in rooms[key]]
+        room = " / ".join(
+            next((row['sala'] for row in rooms[key] if normalize_text(row['sala']) == key), key.upper())
+            for key in keys
+        )
+        return f"Na sala {room} tem {self._group_classes(rows, 'professor')}."
+
+    def response_room_now_question(self, question_lower: str, day: int, minute: int) -> str:
+        """Responde que aula acontece agora numa sala (busca binária na linha do tempo)"""
+        question = self.clear_text(question_lower)
+        keys = self._find_rooms(question)
+        if not keys:
+            return f"⚠️ Sala não encontrada na pergunta: {question}"
+        timeline = self._get_timeline()
+        answers = []
+        for key in keys:
+            room = timeline.rooms.get(key, key.upper())
+            rows = timeline.at(day, minute, room=key)
+            if rows:
+                answers.append(f"Agora na sala {room} tem {self._group_classes(rows, 'professor')}.")
+                continue
+            next_day, start, rows = timeline.next(day, minute, room=key)
+            if next_day == day:
+                answers.append(f"A sala {room} está livre agora. A próxima aula lá começa às "
+                               f"{format_minutes(start)}: {self._group_classes(rows, 'professor')}.")
             else:
-                return f"⚠️ Disciplina não encontrado na pergunta: {question}"
+                answers.append(f"A sala {room} está livre agora e não tem mais aulas hoje.")
+        return " ".join(answers)
 
+    def response_next_class_question(self, question_lower: str, day: int, minute: int) -> str:
+        """Responde a próxima aula de uma sala, de um curso ou de toda a faculdade"""
+        timeline = self._get_timeline()
+        room = code = None
+        if 'sala' in normalize_text(question_lower).split():
+            keys = self._find_rooms(self.clear_text(question_lower))
+            if not keys:
+                return f"⚠️ Sala não encontrada na pergunta: {self.clear_text(question_lower)}"
+            room = keys[0]
+            scope = f" na sala {timeline.rooms.get(room, room.upper())}"
         else:
-            return f"⚠️ Curso não encontrado na pergunta: {question}"
+            code = self._find_course_code(question_lower)
+            scope = f" de {self.course_names()[code]}" if code else ""
+
+        next_day, start, rows = timeline.next(day, minute, room=room, course=code)
+        if next_day is None:
+            return f"Não encontrei próximas aulas{scope}."
+        when = "hoje" if next_day == day else WEEKDAYS[next_day]
+        return (f"A próxima aula{scope} começa {when} às {format_minutes(start)}: "
+                f"{self._group_classes(rows, 'sala', 'professor')}.")
+
+    def response_free_rooms_question(self, day: int, minute: int) -> str:
+        """Responde quais salas da tabela estão sem aula agora"""
+        rooms = self._get_timeline().free_rooms(day, minute)
+        if not rooms:
+            return "Nenhuma sala está livre agora."
+        return f"Salas livres agora ({WEEKDAYS[day]} {format_minutes(minute)}): {', '.join(rooms)}."
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""
+Módulo de codificação fonética para nomes em português (no estilo do Metaphone-PT)
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from modules.schedule_search import normalize_text
+
+_VOWELS = set("aeiou")
+
+# Dígrafos e grupos reescritos antes da codificação letra a letra (a ordem importa)
+_REWRITES = [
+    (re.compile(r"ç"), "s"),
+    (re.compile(r"c(?=(?:ão|ao|ões|oes)$)"), "s"),  # "computacao": o STT às vezes perde a cedilha
+    (re.compile(r"[sx]c(?=[eiéêí])"), "s"),
+    (re.compile(r"ch|sh"), "x"),
+    (re.compile(r"lh"), "l"),
+    (re.compile(r"nh"), "n"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"th"), "t"),
+    (re.compile(r"qu(?=[eiéêí])|gu(?=[eiéêí])"), lambda m: "k" if m.group()[0] == "q" else "g"),
+    (re.compile(r"c(?=[eiéêí])"), "s"),
+    (re.compile(r"g(?=[eiéêí])"), "j"),
+]
+_LETTERS = str.maketrans({"c": "k", "q": "k", "z": "s", "w": "v", "y": "i", "h": None})
+
+
+@lru_cache(maxsize=4096)
+def phonetic_word(word: str) -> str:
+    """Codifica uma palavra: consoantes pelo som, vogais removidas (exceto a inicial).
+
+    Números ficam como estão. Ex.: "física" e "fizica" -> "fsk";
+    "computação" e "computacao" -> "kmpts"; "cálculo" e "kalculo" -> "klkl".
+    """
+    if word.isdigit():
+        return word
+    word = word.lower()
+    for pattern, replacement in _REWRITES:
+        word = pattern.sub(replacement, word)
+    word = normalize_text(word).replace(" ", "").translate(_LETTERS)
+    if not word:
+        return ""
+    key = [word[0]]
+    for i in range(1, len(word)):
+        ch = word[i]
+        if ch in _VOWELS or ch == key[-1]:
+            continue
+        if ch == "m" and (i + 1 == len(word) or word[i + 1] not in _VOWELS):
+            ch = "n"  # "m" nasal (antes de consoante ou no fim) soa como "n"
+        if ch != key[-1]:
+            key.append(ch)
+    return "".join(key)
+
+
+def _word_keys(words: List[str]) -> List[str]:
+    """Chave de cada palavra; palavras de 1-2 letras (como no clear_text do PDFReader) viram ''"""
+    keys = []
+    for word in words:
+        clean = "".join(ch for ch in word if ch.isalnum())
+        keys.append("" if not clean or (clean.isalpha() and len(clean) <= 2) else phonetic_word(clean))
+    return keys
+
+
+def phonetic_key(text: str) -> str:
+    """Codifica um nome inteiro (chaves das palavras separadas por espaço)"""
+    return " ".join(key for key in _word_keys(text.lower().split()) if key)
+
+
+class PhoneticIndex:
+    """Hash chave fonética -> nome, para resolver nomes sem varredura aproximada.
+
+    Chaves compartilhadas por nomes diferentes são marcadas como ambíguas e não
+    resolvem nada (a consulta cai para a busca aproximada).
+    """
+
+    __slots__ = ('_index',)
+
+    def __init__(self, names: Iterable[str]):
+        index: Dict[str, Optional[str]] = {}
+        for name in names:
+            key = phonetic_key(name)
+            if not key:
+                continue
+            if key in index and index[key] != name:
+                index[key] = None
+            else:
+                index[key] = name
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, text: str, max_ngram: int = 6) -> Optional[Tuple[str, str]]:
+        """Procura os n-gramas do texto no índice, do mais longo para o mais curto.
+
+        Cada palavra é codificada uma única vez; a chave de um n-grama é a junção
+        das chaves das palavras. Retorna (n-grama, nome) ou None.
+        """
+        words = text.lower().split()
+        keys = _word_keys(words)
+        for n in range(min(max_ngram, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                key = " ".join(k for k in keys[i:i + n] if k)
+                name = self._index.get(key) if key else None
+                if name is not None:
+                    return " ".join(words[i:i + n]), name
+        return None
@@ -0,0 +1,152 @@
+"""
+Módulo das etapas da conversa (fila limitada + worker) e seus contadores
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+from modules.resource_usage import LATENCY_SAMPLES, latency_percentiles
+
+# O que fazer quando a fila de uma etapa está cheia
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+_CLOSE = object()  # sentinela que encerra o worker
+
+
+class StageStats:
+    """Contadores de uma etapa; acumulam entre conversas"""
+
+    def __init__(self, name: str, maxsize: int, overflow: str):
+        self.name = name
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.wait_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)  # tempo na fila
+        self.service_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)  # tempo no handler
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'capacity': self.maxsize,
+                'overflow': self.overflow,
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'enqueued': self.enqueued,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'wait_ms': latency_percentiles(self.wait_times),
+                'service_ms': latency_percentiles(self.service_times),
+            }
+
+
+class PipelineStage:
+    """Fila limitada de uma etapa e o worker que a consome no loop asyncio.
+
+    O handler roda em uma thread de trabalho (asyncio.to_thread), um item por vez
+    e na ordem de chegada. Com a fila cheia, a política de overflow decide:
+    drop_oldest descarta o item mais antigo, drop_newest descarta o novo e block
+    faz quem produz esperar por espaço.
+    """
+
+    def __init__(self, name: str, handler: Callable, maxsize: int = 4, overflow: str = 'drop_oldest'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de overflow inválida: {overflow} (use {', '.join(OVERFLOW_POLICIES)})")
+        self.name = name
+        self.handler = handler
+        self.stats = StageStats(name, max(1, maxsize), overflow)
+        self.handler_thread: Optional[int] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._drain = True
+
+    def start(self):
+        """Cria a fila e o worker no loop atual"""
+        self._queue = asyncio.Queue(maxsize=self.stats.maxsize)
+        self._closing = False
+        with self.stats._lock:
+            self.stats.depth = 0
+        self._task = asyncio.get_running_loop().create_task(self._work(), name=self.name)
+
+    async def put(self, item) -> bool:
+        """Enfileira um item (no loop) aplicando a política de overflow; False se descartado"""
+        stats = self.stats
+        if self._closing:
+            return False
+        if self._queue.full():
+            if stats.overflow == 'drop_newest':
+                with stats._lock:
+                    stats.dropped += 1
+                return False
+            if stats.overflow == 'drop_oldest':
+                self._queue.get_nowait()
+                with stats._lock:
+                    stats.dropped += 1
+                    stats.depth -= 1
+        await self._queue.put((time.perf_counter(), item))
+        with stats._lock:
+            stats.enqueued += 1
+            stats.depth += 1
+            stats.max_depth = max(stats.max_depth, stats.depth)
+        return True
+
+    async def close(self, drain: bool):
+        """Encerra o worker; sem drain os itens pendentes são descartados.
+
+        O item em tratamento sempre termina antes de close() retornar.
+        """
+        self._closing = True
+        self._drain = drain
+        if not drain:
+            self._discard_pending()
+        await self._queue.put(_CLOSE)  # com a fila cheia, espera o worker abrir espaço
+        await self._task
+
+    def _discard_pending(self) -> List:
+        discarded = []
+        while not self._queue.empty():
+            discarded.append(self._queue.get_nowait())
+        with self.stats._lock:
+            self.stats.dropped += len(discarded)
+            self.stats.depth -= len(discarded)
+        return discarded
+
+    async def _work(self):
+        stats = self.stats
+        while True:
+            entry = await self._queue.get()
+            if entry is _CLOSE:
+                return
+            queued_at, item = entry
+            started = time.perf_counter()
+            with stats._lock:
+                stats.depth -= 1
+                if self._closing and not self._drain:
+                    # Entrou depois do descarte (produtor que esperava espaço)
+                    stats.dropped += 1
+                    continue
+                stats.wait_times.append(started - queued_at)
+            try:
+                await asyncio.to_thread(self._call, item)
+            except Exception as e:
+                print(f"❌ Erro na etapa '{self.name}': {e}")
+                with stats._lock:
+                    stats.errors += 1
+            with stats._lock:
+                stats.processed += 1
+                stats.service_times.append(time.perf_counter() - started)
+
+    def _call(self, item):
+        self.handler_thread = threading.get_ident()
+        try:
+            self.handler(item)
+        finally:
+            self.handler_thread = None
@@ -0,0 +1,75 @@
+"""
+Módulo de medição de tempo e memória (relatório de inicialização e percentis de latência)
+"""
+import os
+import sys
+import time
+from typing import Deque, Dict, Optional, Tuple
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+# Amostras de latência mantidas por contador (etapas da conversa, fala) para os percentis
+LATENCY_SAMPLES = 256
+
+
+def latency_percentiles(samples: Deque[float]) -> Dict[str, float]:
+    """p50/p95/máx em milissegundos"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'p50': round(pick(0.5) * 1e3, 2), 'p95': round(pick(0.95) * 1e3, 2),
+            'max': round(ordered[-1] * 1e3, 2)}
+
+
+def rss_bytes() -> Optional[int]:
+    """Memória residente (RSS) atual do processo, em bytes.
+
+    No Linux (Raspberry Pi) lê /proc/self/statm; nos outros sistemas usa o pico
+    de RSS do resource, e no Windows retorna None.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # macOS em bytes, Linux em KB
+
+
+def usage_snapshot() -> Tuple[float, float, Optional[int]]:
+    """Retorna (relógio de parede, CPU da thread atual, RSS) para medir um trecho"""
+    return time.perf_counter(), time.thread_time(), rss_bytes()
+
+
+def usage_since(start: Tuple[float, float, Optional[int]]) -> Dict[str, Optional[float]]:
+    """Tempo de parede, CPU (só da thread atual) e variação de RSS desde usage_snapshot().
+
+    A CPU é a da thread que executou o trecho, então etapas que rodam em paralelo
+    não contam o trabalho umas das outras; a RSS é do processo inteiro.
+    """
+    wall, cpu, rss = start
+    now_rss = rss_bytes()
+    return {
+        'wall_s': round(time.perf_counter() - wall, 4),
+        'cpu_s': round(time.thread_time() - cpu, 4),
+        'rss_delta_mb': round((now_rss - rss) / 1024 / 1024, 2) if rss is not None and now_rss is not None else None,
+    }
+
+
+def format_usage_table(rows: Dict[str, dict], title: str = "Tempo de inicialização") -> str:
+    """Monta uma tabela compacta (etapa, parede, CPU, ΔRSS) para o modo DEBUG"""
+    width = max([len(name) for name in rows] + [5])
+    lines = [f"⏱️ {title}:", f"   {'etapa':<{width}}  {'parede':>8}  {'CPU':>8}  {'ΔRSS':>10}"]
+    for name, usage in rows.items():
+        rss = usage.get('rss_delta_mb')
+        rss_text = f"{rss:+.1f} MB" if rss is not None else "n/d"
+        lines.append(f"   {name:<{width}}  {usage['wall_s']:>7.2f}s  {usage['cpu_s']:>7.2f}s  {rss_text:>10}")
+    return "\n".join(lines)
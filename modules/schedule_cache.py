@@ -0,0 +1,137 @@
+"""
+Módulo de cache em disco das tabelas de horário extraídas dos PDFs
+"""
+import hashlib
+import os
+import pickle
+from typing import Any, Iterable, Optional
+
+
+class ScheduleCache:
+    """Guarda em disco as tabelas já limpas, uma entrada por PDF.
+
+    Cada entrada é invalidada quando o conteúdo do PDF muda (hash SHA-256)
+    ou quando a versão do pipeline de limpeza é incrementada. O mtime e o
+    tamanho do arquivo servem de atalho para evitar recalcular o hash a cada boot.
+    Cada arquivo guarda dois pickles: o cabeçalho (versão, hash, mtime, tamanho e
+    as linhas da busca livre do curso) e a tabela, então is_fresh() e get_rows()
+    leem uma entrada sem carregar a tabela.
+    """
+
+    # Formato do arquivo de cada entrada (cabeçalho com as linhas + tabela)
+    FORMAT = 3
+
+    def __init__(self, cache_folder: str, version: int):
+        self.cache_folder = cache_folder
+        self.version = version
+        os.makedirs(self.cache_folder, exist_ok=True)
+
+    def _entry_path(self, pdf_path: str) -> str:
+        """Retorna o caminho da entrada de cache de um PDF"""
+        return os.path.join(self.cache_folder, os.path.basename(pdf_path) + ".pkl")
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        """Calcula o SHA-256 do conteúdo de um arquivo"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _read_entry(self, pdf_path: str, with_table: bool = True) -> Optional[dict]:
+        """Lê uma entrada do cache, ignorando arquivos corrompidos ou de outra versão.
+
+        Com with_table=False só o cabeçalho é lido.
+        """
+        entry_path = self._entry_path(pdf_path)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+                if (not isinstance(entry, dict) or entry.get('format') != self.FORMAT
+                        or entry.get('version') != self.version):
+                    return None
+                if with_table:
+                    entry['table'] = pickle.load(f)
+        except Exception:
+            return None
+        return entry
+
+    def _write_entry(self, pdf_path: str, entry: dict):
+        """Grava uma entrada de forma atômica (arquivo temporário + rename)"""
+        entry_path = self._entry_path(pdf_path)
+        tmp_path = entry_path + ".tmp"
+        header = {key: value for key, value in entry.items() if key != 'table'}
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(entry['table'], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar cache de {os.path.basename(pdf_path)}: {e}")
+
+    def get(self, pdf_path: str) -> Optional[Any]:
+        """Retorna a tabela em cache do PDF ou None se ausente/desatualizada"""
+        entry = self._read_entry(pdf_path)
+        if entry is None:
+            return None
+
+        stat = os.stat(pdf_path)
+        if entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            return entry['table']
+
+        # mtime mudou (cópia, checkout...), mas o conteúdo pode ser o mesmo
+        if entry.get('sha256') == self._file_hash(pdf_path):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            self._write_entry(pdf_path, entry)
+            return entry['table']
+
+        return None
+
+    def is_fresh(self, pdf_path: str) -> bool:
+        """Verifica, só pelo cabeçalho, se a entrada do PDF está em dia (mesmo mtime e tamanho).
+
+        Não recalcula o hash: um PDF só copiado (mtime novo) conta como desatualizado.
+        """
+        entry = self._read_entry(pdf_path, with_table=False)
+        if entry is None:
+            return False
+        stat = os.stat(pdf_path)
+        return entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size
+
+    def get_rows(self, pdf_path: str) -> Optional[list]:
+        """Retorna as linhas guardadas no cabeçalho, sem ler a tabela, ou None se a
+        entrada está ausente ou desatualizada (mesmo critério de is_fresh())"""
+        entry = self._read_entry(pdf_path, with_table=False)
+        if entry is None or entry.get('rows') is None:
+            return None
+        stat = os.stat(pdf_path)
+        if entry.get('mtime_ns') != stat.st_mtime_ns or entry.get('size') != stat.st_size:
+            return None
+        return entry['rows']
+
+    def put(self, pdf_path: str, table: Any, rows: Optional[list] = None):
+        """Armazena a tabela limpa de um PDF e, no cabeçalho, as linhas dos índices globais"""
+        stat = os.stat(pdf_path)
+        self._write_entry(pdf_path, {
+            'format': self.FORMAT,
+            'version': self.version,
+            'sha256': self._file_hash(pdf_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'rows': rows,
+            'table': table,
+        })
+
+    def prune(self, pdf_files: Iterable[str]):
+        """Remove entradas de PDFs que não existem mais na pasta de dados"""
+        valid = {os.path.basename(f) + ".pkl" for f in pdf_files}
+        for name in os.listdir(self.cache_folder):
+            if name.endswith(".pkl") and name not in valid:
+                try:
+                    os.remove(os.path.join(self.cache_folder, name))
+                except OSError:
+                    pass
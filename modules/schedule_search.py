@@ -0,0 +1,118 @@
+"""
+Módulo de busca livre nos horários por TF-IDF de n-gramas de caracteres
+"""
+import math
+import sys
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação (tolerante a erros do STT)"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in text).split())
+
+
+def char_ngrams(text: str, n: int = 3) -> Counter:
+    """Conta os n-gramas de caracteres de cada palavra (com espaços nas bordas)"""
+    grams = Counter()
+    for word in normalize_text(text).split():
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams[padded] += 1
+            continue
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+class ScheduleSearchIndex:
+    """Matriz TF-IDF esparsa (linhas de horário x n-gramas) guardada por coluna.
+
+    Cada n-grama tem sua lista de (documento, peso) em arrays NumPy contíguos,
+    como uma matriz CSC. A consulta é um produto matriz-vetor esparso: junta as
+    listas dos n-gramas da pergunta e soma os pesos por documento com
+    np.bincount, seguido de seleção top-k com np.argpartition.
+    """
+
+    def __init__(self, documents: List[Dict[str, str]], texts: List[str], n: int = 3):
+        self.n = n
+        self.documents = documents
+        vocabulary = {}
+        postings: List[List[Tuple[int, float]]] = []
+        doc_grams = [char_ngrams(text, n) for text in texts]
+
+        # Frequência de documentos por n-grama -> IDF suavizado
+        document_frequency = Counter()
+        for grams in doc_grams:
+            document_frequency.update(grams.keys())
+        total = len(doc_grams)
+        for gram in document_frequency:
+            vocabulary[gram] = len(vocabulary)
+            postings.append([])
+        self.vocabulary = vocabulary
+        self.idf = np.array(
+            [math.log((1 + total) / (1 + document_frequency[gram])) + 1 for gram in vocabulary],
+            dtype=np.float32
+        )
+
+        # TF sublinear x IDF, linhas normalizadas (norma L2)
+        for doc_id, grams in enumerate(doc_grams):
+            weights = {vocabulary[g]: (1 + math.log(c)) * self.idf[vocabulary[g]] for g, c in grams.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                postings[term].append((doc_id, weight / norm))
+
+        lengths = np.array([len(p) for p in postings], dtype=np.int64)
+        self.term_ptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.doc_ids = np.fromiter((d for p in postings for d, _ in p), dtype=np.int32, count=int(lengths.sum()))
+        self.weights = np.fromiter((w for p in postings for _, w in p), dtype=np.float32, count=int(lengths.sum()))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]], fields: Iterable[str]) -> "ScheduleSearchIndex":
+        """Monta o índice com um documento por linha, concatenando os campos indicados"""
+        documents = list(rows)
+        fields = list(fields)
+        texts = [" ".join(doc.get(field, "") for field in fields) for doc in documents]
+        return cls(documents, texts)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def memory_usage(self) -> int:
+        """Estima em bytes a memória da matriz e do vocabulário (sem os documentos)"""
+        size = self.idf.nbytes + self.term_ptr.nbytes + self.doc_ids.nbytes + self.weights.nbytes
+        size += sys.getsizeof(self.vocabulary) + sum(sys.getsizeof(gram) for gram in self.vocabulary)
+        return size + sys.getsizeof(self.documents)
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, Dict[str, str]]]:
+        """Retorna até k (similaridade do cosseno, documento) em ordem decrescente"""
+        if not self.documents:
+            return []
+        grams = char_ngrams(query, self.n)
+        terms, query_weights = [], []
+        for gram, count in grams.items():
+            term = self.vocabulary.get(gram)
+            if term is not None:
+                terms.append(term)
+                query_weights.append((1 + math.log(count)) * self.idf[term])
+        if not terms:
+            return []
+        # n-gramas fora do vocabulário também entram na norma da pergunta
+        unknown = sum((1 + math.log(c)) ** 2 for g, c in grams.items() if g not in self.vocabulary)
+        query_weights = np.array(query_weights, dtype=np.float32)
+        query_norm = math.sqrt(float(query_weights @ query_weights) + unknown) or 1.0
+
+        starts, ends = self.term_ptr[terms], self.term_ptr[np.array(terms) + 1]
+        counts = ends - starts
+        positions = np.repeat(ends - counts.cumsum(), counts) + np.arange(counts.sum())
+        contributions = self.weights[positions] * np.repeat(query_weights / query_norm, counts)
+        scores = np.bincount(self.doc_ids[positions], weights=contributions, minlength=len(self.documents))
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.documents[i]) for i in top if scores[i] > 0]
@@ -0,0 +1,68 @@
+"""
+Módulo com armazenamento compacto das tabelas de horário, sem pandas
+"""
+import sys
+from typing import Dict, Iterable, List
+
+
+class ScheduleTable:
+    """Tabela de horários em colunas (listas de strings internadas).
+
+    Oferece o subconjunto da interface do DataFrame usado pelo PDFReader
+    (table['COLUNA'], len, shape). As consultas não percorrem a tabela: usam o
+    índice de disciplinas de cada curso (PDFReader._build_course_index).
+    """
+
+    __slots__ = ('columns', '_data')
+
+    def __init__(self, columns: List[str], data: Dict[str, List[str]]):
+        self.columns = columns
+        self._data = data
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "ScheduleTable":
+        """Monta a tabela a partir de linhas (dicts coluna -> valor)"""
+        columns = []
+        data = {}
+        count = 0
+        for record in records:
+            for column in record:
+                if column not in data:
+                    columns.append(column)
+                    data[column] = [None] * count
+            for column in columns:
+                value = record.get(column)
+                data[column].append(sys.intern(value) if isinstance(value, str) else value)
+            count += 1
+        return cls(columns, data)
+
+    def __getitem__(self, column: str) -> List[str]:
+        return self._data[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._data
+
+    def __len__(self) -> int:
+        return len(self._data[self.columns[0]]) if self.columns else 0
+
+    def __getstate__(self):
+        return self.columns, self._data
+
+    def __setstate__(self, state):
+        self.columns, self._data = state
+
+    @property
+    def shape(self):
+        return len(self), len(self.columns)
+
+    def memory_usage(self) -> int:
+        """Estima em bytes a memória ocupada (strings internadas contam uma vez)"""
+        seen = set()
+        size = sys.getsizeof(self._data)
+        for values in self._data.values():
+            size += sys.getsizeof(values)
+            for value in values:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
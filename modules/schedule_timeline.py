@@ -0,0 +1,149 @@
+"""
+Módulo com os horários convertidos em intervalos numéricos por dia e sala
+"""
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+from modules.schedule_search import normalize_text
+
+# Ordem dos dias da semana (0 = segunda, como datetime.weekday())
+WEEKDAYS = ('segunda', 'terça', 'quarta', 'quinta', 'sexta', 'sábado', 'domingo')
+_DAY_PREFIXES = {normalize_text(day)[:3]: i for i, day in enumerate(WEEKDAYS)}
+_INTERVAL_RE = re.compile(r"(\d{1,2})[:h](\d{2})\s*-\s*(\d{1,2})[:h](\d{2})")
+
+
+def parse_interval(text: str) -> Optional[Tuple[int, int]]:
+    """Converte "HH:MM - HH:MM" em (início, fim) em minutos desde meia-noite"""
+    match = _INTERVAL_RE.search(text or "")
+    if not match:
+        return None
+    h1, m1, h2, m2 = map(int, match.groups())
+    start, end = h1 * 60 + m1, h2 * 60 + m2
+    return (start, end) if end > start else None
+
+
+def weekday_index(day: str) -> Optional[int]:
+    """Converte o nome do dia ("terça", "terca-feira", "Sáb") no índice de WEEKDAYS"""
+    return _DAY_PREFIXES.get(normalize_text(day or "")[:3])
+
+
+def format_minutes(minutes: int) -> str:
+    """Formata minutos desde meia-noite como HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class _Intervals:
+    """Intervalos de um dia ordenados pelo início, com o maior fim acumulado.
+
+    Para achar as aulas em andamento num instante t, a busca binária dá a última
+    aula que começou até t; a partir dela volta-se enquanto o maior fim acumulado
+    (não decrescente) passar de t. Assim aulas sobrepostas na mesma sala também
+    são encontradas, sem varrer o dia inteiro.
+    """
+
+    __slots__ = ('starts', 'ends', 'max_ends', 'rows')
+
+    def __init__(self, entries: List[Tuple[int, int, dict]]):
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        self.starts = [start for start, _, _ in entries]
+        self.ends = [end for _, end, _ in entries]
+        self.rows = [row for _, _, row in entries]
+        self.max_ends = []
+        highest = 0
+        for end in self.ends:
+            highest = max(highest, end)
+            self.max_ends.append(highest)
+
+    def at(self, minute: int) -> List[dict]:
+        """Linhas cujo intervalo [início, fim) contém o minuto"""
+        found = []
+        i = bisect_right(self.starts, minute) - 1
+        while i >= 0 and self.max_ends[i] > minute:
+            if self.ends[i] > minute:
+                found.append(self.rows[i])
+            i -= 1
+        found.reverse()
+        return found
+
+    def next(self, minute: int) -> Tuple[Optional[int], List[dict]]:
+        """Primeiro início a partir do minuto e as linhas que começam nele"""
+        i = bisect_left(self.starts, minute)
+        if i == len(self.starts):
+            return None, []
+        start = self.starts[i]
+        j = bisect_right(self.starts, start)
+        return start, self.rows[i:j]
+
+
+class ScheduleTimeline:
+    """Linhas de horário indexadas por (sala, dia), (curso, dia) e dia.
+
+    O HORÁRIO de cada linha é convertido em minutos uma única vez, na montagem;
+    as consultas de "agora" e "próxima aula" são buscas binárias nessas listas.
+    As salas usam a mesma chave normalizada dos índices reversos do PDFReader.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]]):
+        by_room, by_course, by_day = {}, {}, {}
+        self.rooms = {}  # sala normalizada -> nome como aparece na tabela
+        for row in rows:
+            rooms = [(normalize_text(room), room.strip()) for room in row['sala'].split('/')]
+            for key, name in rooms:
+                if key and (key not in self.rooms or normalize_text(row['sala']) == key):
+                    self.rooms[key] = name
+            interval = parse_interval(row['horario'])
+            day = weekday_index(row['dia'])
+            if interval is None or day is None:
+                continue
+            entry = (interval[0], interval[1], row)
+            by_day.setdefault(day, []).append(entry)
+            by_course.setdefault((row['code'], day), []).append(entry)
+            for key, _ in rooms:
+                if key:
+                    by_room.setdefault((key, day), []).append(entry)
+        self._by_room = {key: _Intervals(entries) for key, entries in by_room.items()}
+        self._by_course = {key: _Intervals(entries) for key, entries in by_course.items()}
+        self._by_day = {key: _Intervals(entries) for key, entries in by_day.items()}
+
+    def memory_usage(self) -> int:
+        """Estima em bytes a memória dos intervalos (as linhas são as dos outros índices)"""
+        size = sys.getsizeof(self.rooms) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.rooms.items())
+        for intervals in (self._by_room, self._by_course, self._by_day):
+            size += sys.getsizeof(intervals)
+            for key, entry in intervals.items():
+                size += sys.getsizeof(key) + sum(
+                    sys.getsizeof(values) for values in (entry.starts, entry.ends, entry.max_ends, entry.rows))
+        return size
+
+    def _intervals(self, day: int, room: Optional[str] = None, course: Optional[str] = None) -> Optional[_Intervals]:
+        if room is not None:
+            return self._by_room.get((room, day))
+        if course is not None:
+            return self._by_course.get((course, day))
+        return self._by_day.get(day)
+
+    def at(self, day: int, minute: int, room: Optional[str] = None, course: Optional[str] = None) -> List[dict]:
+        """Aulas em andamento no dia/minuto (filtrando por sala ou curso)"""
+        intervals = self._intervals(day, room, course)
+        return intervals.at(minute) if intervals else []
+
+    def next(self, day: int, minute: int, room: Optional[str] = None,
+             course: Optional[str] = None) -> Tuple[Optional[int], Optional[int], List[dict]]:
+        """Próximas aulas a partir do dia/minuto, seguindo pelos dias da semana.
+
+        Retorna (dia, início, linhas) ou (None, None, []) se não houver aula.
+        """
+        for offset in range(len(WEEKDAYS)):
+            current = (day + offset) % len(WEEKDAYS)
+            intervals = self._intervals(current, room, course)
+            if intervals:
+                start, rows = intervals.next(minute if offset == 0 else 0)
+                if start is not None:
+                    return current, start, rows
+        return None, None, []
+
+    def free_rooms(self, day: int, minute: int) -> List[str]:
+        """Salas da tabela sem aula em andamento no dia/minuto"""
+        return [name for key, name in sorted(self.rooms.items(), key=lambda item: item[1])
+                if not self.at(day, minute, room=key)]
@@ -0,0 +1,276 @@
+"""
+Módulo da API local do modo serviço (HTTP em localhost ou em um socket Unix)
+
+O bot fica residente em um único processo e outros processos (ex.: o código de
+movimento do robô) usam as funções do chatbot.py por requisições JSON, sem
+importar os modelos:
+
+    GET  /status                                          -> get_status()
+    POST /ask                {"question": "..."}          -> answer() (sem pausar/sair)
+    POST /conversation/start {"duration_minutes": 5}      -> start_conversation()
+    POST /conversation/stop                               -> stop_conversation()
+    POST /speak_and_listen   {"message": "...", "timeout": 10} -> speak_and_listen()
+
+Respostas: {"ok": true, "result": ...} ou {"ok": false, "error": "..."}.
+"""
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Corpo máximo aceito em uma requisição (as perguntas são frases curtas)
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ServiceError(Exception):
+    """Erro de uma chamada à API, com o status HTTP da resposta"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class BotService:
+    """Traduz as requisições da API em chamadas ao bot residente.
+
+    Perguntas (ask) e status rodam em paralelo, cada uma na thread da sua
+    requisição. Microfone e alto-falante são únicos: speak_and_listen e o
+    início/fim de conversa são serializados por travas.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._audio_lock = threading.Lock()
+        self._conversation_lock = threading.Lock()
+
+    def ask(self, question: str) -> str:
+        if not isinstance(question, str) or not question.strip():
+            raise ServiceError("Campo 'question' é obrigatório")
+        # Sem efeitos colaterais: "pare" ou "sair" de um cliente não pausam nem
+        # encerram a conversa dos outros (para isso há /conversation/stop)
+        return self.bot.answer(question)
+
+    def start_conversation(self, duration_minutes: float = 5) -> bool:
+        if not isinstance(duration_minutes, (int, float)) or duration_minutes <= 0:
+            raise ServiceError("Campo 'duration_minutes' deve ser um número positivo")
+        with self._conversation_lock:
+            if self._audio_lock.locked():
+                raise ServiceError("Microfone em uso por /speak_and_listen", status=409)
+            return self.bot.activate_conversation(duration_minutes)
+
+    def stop_conversation(self) -> bool:
+        with self._conversation_lock:
+            if not self.bot.conversation_active:
+                return False
+            self.bot.deactivate_conversation()
+            return True
+
+    def speak_and_listen(self, message: Optional[str] = None, timeout: float = 10.0) -> Optional[str]:
+        if message is not None and not isinstance(message, str):
+            raise ServiceError("Campo 'message' deve ser texto")
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ServiceError("Campo 'timeout' deve ser um número positivo")
+        # Sem STT o bot pediria a resposta pelo teclado (input), o que travaria o serviço
+        if not self.bot.stt.is_available():
+            raise ServiceError("STT não disponível", status=503)
+        if not self._audio_lock.acquire(blocking=False):
+            raise ServiceError("Microfone em uso por outra requisição", status=409)
+        try:
+            # A conversa contínua já escuta o microfone: as duas leituras disputariam as falas
+            with self._conversation_lock:
+                if self.bot.conversation_active:
+                    raise ServiceError("Conversa ativa: o microfone está em uso", status=409)
+            return self.bot.speak_and_listen_once(message, timeout)
+        finally:
+            self._audio_lock.release()
+
+    def status(self) -> dict:
+        return self.bot.get_status()
+
+    def dispatch(self, method: str, path: str, payload: dict) -> Any:
+        """Encaminha uma requisição para a função correspondente"""
+        routes = {
+            ('GET', '/status'): lambda: self.status(),
+            ('POST', '/ask'): lambda: self.ask(payload.get('question')),
+            ('POST', '/conversation/start'): lambda: self.start_conversation(payload.get('duration_minutes', 5)),
+            ('POST', '/conversation/stop'): lambda: self.stop_conversation(),
+            ('POST', '/speak_and_listen'): lambda: self.speak_and_listen(
+                payload.get('message'), payload.get('timeout', 10.0)),
+        }
+        handler = routes.get((method, path.split("?")[0].rstrip("/") or "/"))
+        if handler is None:
+            raise ServiceError(f"Rota não encontrada: {method} {path}", status=404)
+        return handler()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Lê o JSON da requisição, chama o BotService e devolve o JSON da resposta"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive: várias chamadas na mesma conexão
+    # Cabeçalho e corpo saem em escritas separadas; sem TCP_NODELAY o ACK atrasado
+    # do cliente segura a resposta por ~40 ms
+    disable_nagle_algorithm = True
+    server_version = "PudimService/1.0"
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method: str):
+        try:
+            payload = self._read_payload()
+            result = self.server.service.dispatch(method, self.path, payload)
+            self._send(200, {'ok': True, 'result': result})
+        except ServiceError as e:
+            self._send(e.status, {'ok': False, 'error': str(e)})
+        except Exception as e:
+            print(f"❌ Erro no serviço ({method} {self.path}): {e}")
+            self._send(500, {'ok': False, 'error': str(e)})
+
+    def _read_payload(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ServiceError("Requisição grande demais", status=413)
+        if not length:
+            return {}
+        try:
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ServiceError("Corpo da requisição não é um JSON válido")
+        if not isinstance(payload, dict):
+            raise ServiceError("Corpo da requisição deve ser um objeto JSON")
+        return payload
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Em socket Unix o endereço do cliente é uma string vazia
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.debug:
+            print(f"🔌 DEBUG - {self.address_string()} {format % args}")
+
+
+class _UnixRequestHandler(_RequestHandler):
+    """Handler para socket Unix (TCP_NODELAY não se aplica)"""
+
+    disable_nagle_algorithm = False
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTPServer sobre socket Unix, uma thread por conexão"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def create_server(bot, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  socket_path: Optional[str] = None, debug: bool = False):
+    """Cria o servidor da API (socket Unix se socket_path for informado, senão TCP local).
+
+    Cada conexão é atendida em uma thread própria. Use serve_forever() para
+    atender e shutdown()/server_close() para encerrar.
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            # Só apaga o socket de uma execução anterior, nunca um arquivo comum
+            if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                raise FileExistsError(f"SERVICE_SOCKET aponta para {socket_path}, que existe e não é um socket")
+            os.unlink(socket_path)
+        server = _ThreadingUnixHTTPServer(socket_path, _UnixRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _RequestHandler)
+        server.daemon_threads = True
+    server.service = BotService(bot)
+    server.debug = debug
+    return server
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection que conecta em um socket Unix"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ServiceClient:
+    """Cliente da API para outros processos; reaproveita a conexão entre chamadas.
+
+    Não importa o chatbot (nem os modelos). Uma instância por thread.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 socket_path: Optional[str] = None, timeout: Optional[float] = 60.0):
+        self.host, self.port, self.socket_path, self.timeout = host, port, socket_path, timeout
+        self._connection = None
+
+    def _connect(self):
+        if self.socket_path:
+            return _UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> Any:
+        body = json.dumps(payload or {}).encode('utf-8') if method == 'POST' else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                data = json.loads(response.read().decode('utf-8'))
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Conexão keep-alive fechada pelo servidor: reconecta uma vez
+                self.close()
+                if attempt:
+                    raise
+        if not data.get('ok'):
+            raise ServiceError(data.get('error', 'erro desconhecido'), status=response.status)
+        return data.get('result')
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def ask_question(self, question: str) -> str:
+        return self._request('POST', '/ask', {'question': question})
+
+    def start_conversation(self, duration_minutes: float = 5) -> bool:
+        return self._request('POST', '/conversation/start', {'duration_minutes': duration_minutes})
+
+    def stop_conversation(self) -> bool:
+        return self._request('POST', '/conversation/stop')
+
+    def speak_and_listen(self, message: Optional[str] = None, timeout: float = 10.0) -> Optional[str]:
+        return self._request('POST', '/speak_and_listen', {'message': message, 'timeout': timeout})
+
+    def get_status(self) -> dict:
+        return self._request('GET', '/status')
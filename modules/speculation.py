@@ -0,0 +1,136 @@
+"""
+Módulo de respostas especulativas a partir de transcrições parciais
+"""
+import re
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def transcript_key(text: str) -> str:
+    """Forma comparável de uma transcrição: minúsculas, sem pontuação e espaços extras.
+
+    Os acentos são mantidos: a transcrição final só "concorda" com a parcial se
+    as palavras forem as mesmas (o STT costuma mudar só a pontuação e maiúsculas).
+    """
+    return " ".join(_PUNCTUATION_RE.sub(" ", text.lower()).split())
+
+
+class SpeculativeResponder:
+    """Prepara a resposta enquanto o usuário ainda fala.
+
+    Cada transcrição parcial estável (on_partial) dispara, em uma thread própria,
+    compute(texto) e, se houver resposta, prepare(resposta, cancel) (ex.:
+    pré-sintetizar o áudio) em uma segunda thread. Só a especulação mais recente
+    importa: uma parcial nova descarta a anterior. Quando a transcrição final
+    chega, take() devolve a resposta pronta se o texto concordar com a última
+    parcial; senão o trabalho é descartado. take() espera só o compute, nunca a
+    preparação: ela é interrompida (cancel setado) e o que já ficou pronto (ex.:
+    trechos de áudio no cache) é aproveitado por quem fala a resposta.
+    compute não pode ter efeitos colaterais (roda para frases que talvez nunca
+    sejam confirmadas).
+    """
+
+    def __init__(self, compute: Callable[[str], Optional[str]],
+                 prepare: Optional[Callable[[str, threading.Event], None]] = None, min_words: int = 3):
+        self.compute = compute
+        self.prepare = prepare
+        self.min_words = min_words
+        self.started = 0  # especulações iniciadas
+        self.superseded = 0  # descartadas por uma parcial mais nova
+        self.hits = 0  # finais que concordaram com a especulação
+        self.misses = 0  # finais diferentes da última parcial
+        self.used = 0  # acertos que tinham uma resposta pronta para usar
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculation")
+        self._prepare_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculation-prepare")
+        self._lock = threading.Lock()
+        self._key: Optional[str] = None
+        self._future: Optional[Future] = None
+        self._cancel = threading.Event()  # interrompe a preparação da especulação corrente
+
+    def on_partial(self, text: str):
+        """Recebe uma transcrição parcial estável (thread do STT)"""
+        key = transcript_key(text)
+        if len(key.split()) < self.min_words:
+            return
+        with self._lock:
+            if key == self._key:
+                return
+            if self._future is not None:
+                self._future.cancel()
+                self._cancel.set()
+                self.superseded += 1
+            self._key = key
+            self.started += 1
+            self._cancel = threading.Event()
+            self._future = self._executor.submit(self._run, text, self._cancel)
+
+    def _run(self, text: str, cancel: threading.Event) -> Optional[str]:
+        response = self.compute(text)
+        # A preparação roda à parte: o resultado de take() não depende dela
+        if response and self.prepare and not cancel.is_set():
+            self._prepare_executor.submit(self._prepare, response, cancel)
+        return response
+
+    def _prepare(self, response: str, cancel: threading.Event):
+        if cancel.is_set():
+            return
+        try:
+            self.prepare(response, cancel)
+        except Exception as e:
+            print(f"⚠️ Falha ao preparar resposta especulativa: {e}")
+
+    def take(self, text: str) -> Optional[str]:
+        """Resposta especulada para a transcrição final, ou None (calcula normalmente).
+
+        Se o compute da especulação que concorda ainda está rodando, espera por
+        ele: o trabalho já está adiantado em relação a começar do zero. A
+        preparação em andamento é interrompida (a fala sintetiza o que faltar).
+        """
+        key = transcript_key(text)
+        with self._lock:
+            future, speculated, cancel = self._future, self._key, self._cancel
+            self._future, self._key = None, None
+            if future is None:
+                return None
+            if speculated != key:
+                future.cancel()
+                cancel.set()
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            response = future.result()
+        except CancelledError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Falha na resposta especulativa: {e}")
+            return None
+        finally:
+            cancel.set()
+        if response is not None:
+            with self._lock:
+                self.used += 1
+        return response
+
+    def reset(self):
+        """Descarta a especulação pendente (ex.: fim da conversa)"""
+        with self._lock:
+            if self._future is not None:
+                self._future.cancel()
+            self._cancel.set()
+            self._future, self._key = None, None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            decided = self.hits + self.misses
+            return {
+                'started': self.started,
+                'superseded': self.superseded,
+                'hits': self.hits,
+                'misses': self.misses,
+                'used': self.used,
+                'hit_rate': self.hits / decided if decided else 0.0,
+            }
@@ -0,0 +1,91 @@
+"""
+Módulo de inicialização concorrente dos componentes do bot
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from modules.resource_usage import usage_since, usage_snapshot
+
+
+class ComponentLoader:
+    """Executa as etapas de inicialização em um pool de threads, respeitando dependências.
+
+    Cada etapa começa assim que todas as suas dependências terminam, então o tempo
+    total tende ao do caminho mais lento do grafo (ex.: modelo do STT) em vez da
+    soma de todas as etapas. A carga dos componentes é dominada por E/S e código
+    nativo (modelos, pdfplumber, microfone), que liberam o GIL. Se uma etapa
+    falhar, nenhuma etapa nova é iniciada e a exceção é repassada a quem chamou run().
+
+    Cada etapa concluída fica em timings: parede, CPU e ΔRSS (ver usage_since), além
+    de started_s/ready_s, os instantes de início e fim contados a partir de run().
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[Tuple[str, ...], Callable[[], None]]] = {}
+        self.timings: Dict[str, dict] = {}
+        self.total_seconds: Optional[float] = None
+        self._run_start = 0.0
+
+    def add(self, name: str, func: Callable[[], None], depends_on: Iterable[str] = ()):
+        """Registra uma etapa e as etapas que precisam terminar antes dela"""
+        self._stages[name] = (tuple(depends_on), func)
+
+    def order(self) -> List[str]:
+        """Retorna uma ordem sequencial válida (ordenação topológica) das etapas"""
+        done, order = set(), []
+        pending = dict(self._stages)
+        while pending:
+            ready = [name for name, (deps, _) in pending.items() if all(dep in done for dep in deps)]
+            if not ready:
+                raise ValueError(f"Dependências inválidas ou circulares entre: {', '.join(pending)}")
+            for name in ready:
+                del pending[name]
+                done.add(name)
+                order.append(name)
+        return order
+
+    def run(self, max_workers: int = 4):
+        """Executa as etapas; com max_workers=1 roda em sequência (ordem topológica)"""
+        unknown = {dep for deps, _ in self._stages.values() for dep in deps if dep not in self._stages}
+        if unknown:
+            raise ValueError(f"Etapas desconhecidas nas dependências: {', '.join(sorted(unknown))}")
+        order = self.order()
+        self.timings = {}
+        self._run_start = time.perf_counter()
+        try:
+            if max_workers <= 1:
+                for name in order:
+                    self._run_stage(name)
+            else:
+                self._run_parallel(order, max_workers)
+        finally:
+            self.total_seconds = round(time.perf_counter() - self._run_start, 4)
+
+    def _run_stage(self, name: str):
+        """Executa uma etapa medindo tempo e memória"""
+        start = usage_snapshot()
+        self._stages[name][1]()
+        usage = usage_since(start)
+        usage['started_s'] = round(start[0] - self._run_start, 4)
+        usage['ready_s'] = round(time.perf_counter() - self._run_start, 4)
+        self.timings[name] = usage
+
+    def _run_parallel(self, order: List[str], max_workers: int):
+        """Submete cada etapa ao pool assim que suas dependências terminam"""
+        done = set()
+        pending = list(order)
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        try:
+            while pending or running:
+                for name in [n for n in pending if all(dep in done for dep in self._stages[n][0])]:
+                    pending.remove(name)
+                    running[executor.submit(self._run_stage, name)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    future.result()  # repassa a exceção da etapa
+                    done.add(name)
+        finally:
+            # Em caso de erro não inicia o que falta; as etapas em andamento terminam sozinhas
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -3,6 +3,7 @@ Módulo de Speech-to-Text (STT) com suporte a múltiplas engines:
 - RealtimeSTT (usando FastWhisper)
 - Speech Recognition (usando Google Speech API)
 """
+import queue
 import threading
 import time
 import os
@@ -12,27 +13,45 @@ from dotenv import load_dotenv
 # Carrega variáveis de ambiente
 load_dotenv()
 
-# Importações condicionais para as bibliotecas STT
-try:
-    from RealtimeSTT import AudioToTextRecorder
-    REALTIME_STT_AVAILABLE = True
-except ImportError:
-    REALTIME_STT_AVAILABLE = False
-    print("⚠️ RealtimeSTT não disponível.")
+# As bibliotecas de STT são pesadas (modelos, drivers de áudio): só a engine
+# escolhida em STT_ENGINE é importada, quando o STTManager é criado
+AudioToTextRecorder = None
+sr = None
+PYAUDIO_AVAILABLE = False
 
-try:
-    import speech_recognition as sr
-    SPEECH_RECOGNITION_AVAILABLE = True
-except ImportError:
-    SPEECH_RECOGNITION_AVAILABLE = False
-    print("⚠️ SpeechRecognition não disponível.")
+# Valores de STT_ENGINE que dispensam microfone (modo texto)
+TEXT_ENGINES = ("text", "text_input", "none")
 
-try:
-    import pyaudio
-    PYAUDIO_AVAILABLE = True
-except ImportError:
-    PYAUDIO_AVAILABLE = False
-    print("⚠️ PyAudio não disponível.")
+
+def _import_realtime_stt() -> bool:
+    """Importa o RealtimeSTT sob demanda"""
+    global AudioToTextRecorder
+    if AudioToTextRecorder is None:
+        try:
+            from RealtimeSTT import AudioToTextRecorder as recorder_class
+        except ImportError:
+            print("⚠️ RealtimeSTT não disponível.")
+            return False
+        AudioToTextRecorder = recorder_class
+    return True
+
+
+def _import_speech_recognition() -> bool:
+    """Importa o SpeechRecognition (e o PyAudio, usado pelo microfone) sob demanda"""
+    global sr, PYAUDIO_AVAILABLE
+    if sr is None:
+        try:
+            import speech_recognition
+        except ImportError:
+            print("⚠️ SpeechRecognition não disponível.")
+            return False
+        sr = speech_recognition
+        try:
+            import pyaudio  # noqa: F401
+            PYAUDIO_AVAILABLE = True
+        except ImportError:
+            print("⚠️ PyAudio não disponível.")
+    return True
 
 
 class STTManager:
@@ -43,6 +62,11 @@ class STTManager:
         self.language = language
         self.is_listening = False
         self.callback = None
+        self.partial_callback = None
+        # Início da gravação da última fala (time.monotonic), para o filtro de eco da conversa
+        self.utterance_started: Optional[float] = None
+        # Transcrição parcial em tempo real (só RealtimeSTT), usada para respostas especulativas
+        self.realtime_partials = os.getenv('STT_REALTIME_PARTIALS', 'False').lower() == 'true'
         
         # Determina qual engine usar baseado no .env
         self.stt_engine = os.getenv('STT_ENGINE', 'speech_recognition').lower()
@@ -60,9 +84,12 @@ class STTManager:
         
     def _initialize_stt(self):
         """Inicializa a engine STT apropriada"""
-        if self.stt_engine == "realtime_stt" and REALTIME_STT_AVAILABLE:
+        if self.stt_engine in TEXT_ENGINES:
+            print("⌨️ STT desativado: usando entrada de texto")
+            self.stt_engine = "text_input"
+        elif self.stt_engine == "realtime_stt" and _import_realtime_stt():
             self._initialize_realtime_stt()
-        elif self.stt_engine == "speech_recognition" and SPEECH_RECOGNITION_AVAILABLE:
+        elif self.stt_engine == "speech_recognition" and _import_speech_recognition():
             self._initialize_speech_recognition()
         else:
             print(f"❌ Engine STT '{self.stt_engine}' não disponível. Usando fallback para texto.")
@@ -71,12 +98,22 @@ class STTManager:
     def _initialize_realtime_stt(self):
         """Inicializa RealtimeSTT"""
         try:
+            partial_options = {}
+            if self.realtime_partials:
+                partial_options = dict(
+                    enable_realtime_transcription=True,
+                    realtime_model_type=os.getenv('STT_REALTIME_MODEL', 'tiny'),
+                    realtime_processing_pause=0.2,
+                    on_realtime_transcription_stabilized=self._on_partial_transcript,
+                )
             self.recorder = AudioToTextRecorder(
                 model=self.model_name,
                 language=self.language,
                 post_speech_silence_duration=1.5,
                 compute_type="float32",
                 device="cpu",  # Use "cuda" para GPU se disponível
+                on_recording_start=self._on_recording_start,
+                **partial_options,
             )
             print(f"✅ RealtimeSTT inicializado com modelo {self.model_name}")
         except Exception as e:
@@ -114,6 +151,26 @@ class STTManager:
         """Define função callback para quando texto for transcrito"""
         self.callback = callback
     
+    def set_partial_callback(self, callback: Optional[Callable[[str], None]]):
+        """Define função callback para as transcrições parciais estáveis (STT_REALTIME_PARTIALS)"""
+        self.partial_callback = callback
+    
+    def supports_partials(self) -> bool:
+        """Verifica se a engine entrega transcrições parciais"""
+        return self.stt_engine == "realtime_stt" and self.realtime_partials and self.recorder is not None
+    
+    def _on_recording_start(self):
+        """O RealtimeSTT detectou o começo de uma fala"""
+        self.utterance_started = time.monotonic()
+    
+    def _on_partial_transcript(self, text: str):
+        """Repassa uma transcrição parcial estável durante a escuta"""
+        if self.is_listening and self.partial_callback and text and text.strip():
+            try:
+                self.partial_callback(text.strip())
+            except Exception as e:
+                print(f"⚠️ Erro ao tratar transcrição parcial: {e}")
+    
     def start_listening(self):
         """Inicia escuta contínua"""
         if self.stt_engine == "text_input":
@@ -135,23 +192,32 @@ class STTManager:
     def stop_listening(self):
         """Para a escuta"""
         self.is_listening = False
+        self._abort_recorder()
         print("🔇 Parando escuta...")
     
+    def _abort_recorder(self):
+        """Interrompe um recorder.text() bloqueado (RealtimeSTT)"""
+        if self.recorder is not None and hasattr(self.recorder, "abort"):
+            try:
+                self.recorder.abort()
+            except Exception as e:
+                print(f"⚠️ Não foi possível interromper o RealtimeSTT: {e}")
+    
     def _realtime_listen_loop(self):
-        """Loop principal de escuta para RealtimeSTT"""
-        while self.is_listening:
+        """Loop principal de escuta para RealtimeSTT.
+
+        recorder.text() bloqueia até o fim de uma fala, então o loop não precisa
+        de pausas entre as chamadas; stop_listening() o destrava com abort().
+        """
+        while self.is_listening and self.recorder:
             try:
-                if self.recorder:
-                    text = self.recorder.text()
-                    if text.strip() and self.callback:
-                        self.callback(text.strip())
-                time.sleep(0.1)
+                text = self.recorder.text()
+                if self.is_listening and text and text.strip() and self.callback:
+                    self.callback(text.strip())
             except Exception as e:
                 print(f"❌ Erro na escuta RealtimeSTT: {e}")
                 time.sleep(1)
     
-
-        print()  # quebra de linha ao final
     def _speech_recognition_listen_loop(self):
         """Loop principal de escuta para Speech Recognition"""
         while self.is_listening:
@@ -162,6 +228,9 @@ class STTManager:
                     with mic as source:
                         # Escuta áudio
                         audio = self.recognizer.listen(source)
+                    # listen() só retorna no fim da fala: o início vem da duração do áudio
+                    self.utterance_started = time.monotonic() - len(audio.frame_data) / (
+                        audio.sample_rate * audio.sample_width)
                     
                     try:
                         # Reconhece fala usando Google
@@ -219,16 +288,30 @@ class STTManager:
             return input("Digite sua mensagem: ")
     
     def _listen_once_realtime(self, timeout: float) -> Optional[str]:
-        """Escuta uma única vez usando RealtimeSTT"""
+        """Escuta uma única vez usando RealtimeSTT.
+
+        recorder.text() roda em uma thread auxiliar e o resultado é aguardado com
+        timeout; se o tempo acabar, a gravação é interrompida com abort().
+        """
+        result = queue.Queue(maxsize=1)
+
+        def transcribe():
+            try:
+                result.put(self.recorder.text())
+            except Exception as e:
+                result.put(e)
+
         try:
             print("🎤 Escutando (RealtimeSTT)...")
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                text = self.recorder.text()
-                if text.strip():
-                                return text.strip()
-                time.sleep(0.1)
-            return None
+            threading.Thread(target=transcribe, daemon=True).start()
+            try:
+                text = result.get(timeout=timeout)
+            except queue.Empty:
+                self._abort_recorder()
+                return None
+            if isinstance(text, Exception):
+                raise text
+            return text.strip() if text and text.strip() else None
         except Exception as e:
             print(f"❌ Erro ao escutar com RealtimeSTT: {e}")
             return None
@@ -1,14 +1,24 @@
 """
 Módulo para utilitários de data e hora
 """
-from datetime import datetime, timedelta
+from datetime import datetime
 import locale
-import re
+from typing import Optional, Tuple
+from modules.intent_matcher import IntentMatcher, default_matcher
 
 class TimeManager:
     """Gerenciador de informações de data e hora"""
+
+    KEYWORDS = [
+        'hora', 'horas', 'time', 'data', 'dia', 'hoje',
+        'agora', 'atual', 'quando', 'que dia', 'que hora',
+        'que horas'
+    ]
     
-    def __init__(self):
+    def __init__(self, matcher: Optional[IntentMatcher] = None):
+        self.matcher = matcher or default_matcher
+        self.matcher.add('time', self.KEYWORDS)
+
         # Tenta configurar locale para português brasileiro
         try:
             locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
@@ -39,6 +49,11 @@ class TimeManager:
             
             return f"{day_name}, {now.day} de {month_name} de {now.year}"
     
+    def get_schedule_moment(self) -> Tuple[int, int]:
+        """Retorna (dia da semana, 0 = segunda; minutos desde meia-noite) para consultar os horários"""
+        now = datetime.now()
+        return now.weekday(), now.hour * 60 + now.minute
+
     def get_current_datetime(self) -> str:
         """Retorna data e hora atuais formatadas"""
         return f"{self.get_current_date()}, {self.get_current_time()}"
@@ -56,14 +71,7 @@ class TimeManager:
     
     def is_time_question(self, text: str) -> bool:
         """Verifica se a pergunta é sobre data/hora"""
-        time_keywords = [
-            'hora', 'horas', 'time', 'data', 'dia', 'hoje',
-            'agora', 'atual', 'quando', 'que dia', 'que hora',
-            'que horas'
-        ]
-        
-        text_lower = text.lower()
-        return any(re.search(rf'\b{keyword}\b', text_lower) for keyword in time_keywords)
+        return self.matcher.matches(text, 'time')
     
     def format_time_response(self, text: str) -> str:
         """Formata resposta sobre data/hora baseada na pergunta"""
@@ -1,44 +1,117 @@
 """
 Módulo de Text-to-Speech (TTS) usando RealtimeTTS
 """
+import queue
+import re
 import threading
 import time
-from typing import Optional
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+from modules.audio_cache import AudioCache
+from modules.resource_usage import LATENCY_SAMPLES, latency_percentiles
 
-try:
-    from RealtimeTTS import TextToAudioStream, KokoroEngine, PiperEngine, PiperVoice, SystemEngine
-    TTS_AVAILABLE = True
-except ImportError:
-    TTS_AVAILABLE = False
-    print("⚠️ RealtimeTTS não disponível. Funcionalidade de voz desabilitada.")
+# Valores de TTS_ENGINE que dispensam o RealtimeTTS (as respostas só são impressas)
+TEXT_ENGINES = ("text", "none")
+
+# Fim de frase (pontuação seguida de espaço, para não quebrar "23:44" ou "2.5") ou de linha
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;:])\s+|\n+")
+_CLAUSE_END_RE = re.compile(r"(?<=,)\s+")
+
+
+def split_speech(text: str, min_chars: int = 20, max_chars: int = 120) -> List[str]:
+    """Divide uma resposta em trechos para sintetizar um enquanto o anterior toca.
+
+    Corta nas frases; frases maiores que max_chars são cortadas também nas
+    vírgulas. Trechos menores que min_chars são juntados ao seguinte (trechos
+    curtos demais deixam a entonação picotada).
+    """
+    pieces = []
+    for sentence in _SENTENCE_END_RE.split(text.strip()):
+        sentence = sentence.strip()
+        if len(sentence) > max_chars:
+            pieces.extend(clause for clause in _CLAUSE_END_RE.split(sentence) if clause)
+        elif sentence:
+            pieces.append(sentence)
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) < min_chars:
+            chunks[-1] += " " + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def _import_realtime_tts():
+    """Importa o RealtimeTTS sob demanda; as classes das engines são lidas só
+    para a engine escolhida, sem carregar as demais (Kokoro, Piper, System)"""
+    try:
+        import RealtimeTTS
+    except ImportError:
+        print("⚠️ RealtimeTTS não disponível. Funcionalidade de voz desabilitada.")
+        return None
+    return RealtimeTTS
 
 
 class TTSManager:
     """Gerenciador de Text-to-Speech"""
     
-    def __init__(self, engine_type: str = "kokoro"):
+    def __init__(self, engine_type: str = "kokoro", cache_folder: Optional[str] = None,
+                 memory_cache_mb: float = 16, streaming: bool = True):
+        """
+        Args:
+            cache_folder: Pasta do cache em disco do áudio das frases fixas (None = só memória)
+            memory_cache_mb: Limite da LRU em memória com o áudio das frases recentes (0 = sem cache)
+            streaming: Sintetiza as respostas frase a frase, tocando cada trecho enquanto o
+                próximo é sintetizado (só com engines de áudio PCM)
+        """
         self.engine_type = engine_type
+        self.voice = None
         self.stream = None
+        self.audio_cache: Optional[AudioCache] = None
         self.is_speaking = False
+        self._stream_lock = threading.Lock()  # uma síntese por vez no stream da engine
+        self._output_lock = threading.Lock()  # reprodução do áudio PCM (cache e streaming)
+        self._pyaudio = None
+        self._output = None  # saída do PyAudio mantida aberta entre as falas
+        self._output_format = None
+        self._cancel = threading.Event()  # stop_speaking() interrompe a fala em streaming
+        self._preparing = False  # prepare() está sintetizando no stream
+        self._preparation_aborted = False  # a fala interrompeu essa síntese (áudio parcial)
+        self._first_audio_times = deque(maxlen=LATENCY_SAMPLES)
+        self._speech_times = deque(maxlen=LATENCY_SAMPLES)
+        self._spoken = {'cache': 0, 'stream': 0, 'direct': 0}
+        self._timing_lock = threading.Lock()
         
-        if TTS_AVAILABLE:
+        if self.engine_type.lower() not in TEXT_ENGINES:
             self._initialize_tts()
+        stream_info = self._pcm_stream_info() if self.stream else None
+        self.streaming = streaming and stream_info is not None
+        if stream_info is not None and memory_cache_mb > 0:
+            audio_format, channels, rate = stream_info
+            namespace = f"{self.engine_type.lower()}-{self.voice}-{audio_format}x{channels}x{rate}"
+            self.audio_cache = AudioCache(cache_folder, namespace, int(memory_cache_mb * 1024 * 1024))
     
     def _initialize_tts(self):
         """Inicializa o TTS"""
+        realtime_tts = _import_realtime_tts()
+        if realtime_tts is None:
+            return
         try:
             if self.engine_type.lower() == "kokoro":
-                engine = KokoroEngine()
-                engine.set_voice("pf_dora")
+                engine = realtime_tts.KokoroEngine()
+                self.voice = "pf_dora"
+                engine.set_voice(self.voice)
             elif self.engine_type.lower() == "piper":
-                voice = PiperVoice()
-                engine = PiperEngine(voice=voice)
+                voice = realtime_tts.PiperVoice()
+                engine = realtime_tts.PiperEngine(voice=voice)
+                self.voice = getattr(voice, "model_file", None) or "padrao"
             else:
                 # Fallback para engine padrão
-                engine = SystemEngine()
-                engine.set_voice("Maria")
+                engine = realtime_tts.SystemEngine()
+                self.voice = "Maria"
+                engine.set_voice(self.voice)
             
-            self.stream = TextToAudioStream(engine, language="pt")
+            self.stream = realtime_tts.TextToAudioStream(engine, language="pt")
             print(f"✅ TTS inicializado com engine {self.engine_type}")
         except Exception as e:
             print(f"❌ Erro ao inicializar TTS: {e}")
@@ -46,7 +119,7 @@ class TTSManager:
     
     def speak(self, text: str, wait: bool = True):
         """Fala o texto fornecido"""
-        if not TTS_AVAILABLE or not self.stream:
+        if not self.stream:
             # Fallback para print em desenvolvimento
             print(f"🔊 {text}")
             return
@@ -56,9 +129,17 @@ class TTSManager:
             try:
                 self.is_speaking = True
                 if wait:
-                    # Modo síncrono
-                    self.stream.feed(text)
-                    self.stream.play()
+                    # Modo síncrono: toca do cache, em streaming ou sintetizando o texto todo
+                    self._cancel.clear()
+                    start = time.perf_counter()
+                    audio = self.audio_cache.get(text) if self.audio_cache else None
+                    if audio is not None:
+                        self._play_pcm(audio)
+                        self._record_speech('cache', 0.0, time.perf_counter() - start)
+                    elif self.streaming:
+                        self._speak_streaming(text, start)
+                    else:
+                        self._synthesize_and_play(text, start)
 
                 else:
                     # Modo assíncrono
@@ -80,10 +161,238 @@ class TTSManager:
         finally:
             self.is_speaking = False
     
+    def _synthesize_and_play(self, text: str, start: float):
+        """Sintetiza e toca o texto todo; os blocos de áudio tocados vão para o cache"""
+        chunks = []
+        first_audio = []
+
+        def on_audio_chunk(chunk: bytes):
+            if not first_audio:
+                first_audio.append(time.perf_counter() - start)
+            chunks.append(chunk)
+
+        self._abort_preparation()
+        with self._stream_lock:
+            self.stream.feed(text)
+            self.stream.play(on_audio_chunk=on_audio_chunk)
+        if chunks and self.audio_cache:
+            self.audio_cache.put(text, b"".join(chunks))
+        self._record_speech('direct', first_audio[0] if first_audio else None, time.perf_counter() - start)
+
+    def _speak_streaming(self, text: str, start: float):
+        """Fala em trechos: uma thread sintetiza o trecho N+1 enquanto esta toca o trecho N.
+
+        Os blocos de áudio são tocados assim que a engine os entrega, então o primeiro
+        som sai depois da síntese do começo do primeiro trecho, não da resposta toda.
+        """
+        audio_queue = queue.Queue()
+        producer = threading.Thread(
+            target=self._synthesize_chunks, args=(text, split_speech(text), audio_queue),
+            name="tts-synthesis", daemon=True
+        )
+        producer.start()
+        first_audio = None
+        while True:
+            audio = audio_queue.get()
+            if audio is None:
+                break
+            if self._cancel.is_set():
+                continue  # descarta o resto até a síntese em andamento terminar
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+            self._play_pcm(audio)
+        producer.join()
+        self._record_speech('stream', first_audio, time.perf_counter() - start)
+
+    def _synthesize_chunks(self, text: str, chunks: List[str], audio_queue: queue.Queue):
+        """Sintetiza os trechos em ordem, entregando cada bloco de áudio na fila (None no fim).
+
+        O áudio de cada trecho vai para o cache; se o texto todo é uma frase fixa,
+        o áudio completo também é guardado com ela, para a próxima vez sair do cache
+        de uma vez (speak() procura o texto inteiro, não os trechos).
+        """
+        whole = [] if self.audio_cache and self.audio_cache.is_canned(text) and chunks != [text] else None
+        try:
+            for i, chunk in enumerate(chunks):
+                if self._cancel.is_set():
+                    whole = None  # fala interrompida: o áudio ficou incompleto
+                    break
+                audio = self.audio_cache.get(chunk) if self.audio_cache else None
+                streamed = False
+                if audio is None:
+                    if i == 0:
+                        self._abort_preparation()
+                    with self._stream_lock:
+                        # Quem segurava o stream (a preparação especulativa) pode ter deixado o trecho pronto
+                        audio = self.audio_cache.get(chunk) if self.audio_cache else None
+                        if audio is None:
+                            audio = self._render(chunk, on_audio=audio_queue.put)
+                            streamed = True
+                            if audio and self.audio_cache:
+                                self.audio_cache.put(chunk, audio)
+                if audio and not streamed:
+                    audio_queue.put(audio)
+                if whole is not None:
+                    if audio:
+                        whole.append(audio)
+                    else:
+                        whole = None  # trecho sem áudio: não grava a frase incompleta
+            if whole and not self._cancel.is_set():
+                self.audio_cache.put(text, b"".join(whole))
+        except Exception as e:
+            print(f"❌ Erro ao sintetizar (streaming): {e}")
+        finally:
+            audio_queue.put(None)
+
+    def _record_speech(self, mode: str, first_audio: Optional[float], total: float):
+        """Guarda o tempo até o primeiro áudio e o tempo total de uma fala"""
+        with self._timing_lock:
+            self._spoken[mode] += 1
+            if first_audio is not None:
+                self._first_audio_times.append(first_audio)
+            self._speech_times.append(total)
+
+    def get_speech_stats(self) -> dict:
+        """Falas por modo (cache, stream, direct) e percentis do tempo até o primeiro
+        áudio e do tempo total de fala, em milissegundos"""
+        with self._timing_lock:
+            return {
+                'streaming': self.streaming,
+                'spoken': dict(self._spoken),
+                'first_audio_ms': latency_percentiles(self._first_audio_times),
+                'total_ms': latency_percentiles(self._speech_times),
+            }
+
+    def synthesize(self, text: str) -> Optional[bytes]:
+        """Sintetiza o texto sem tocar (stream mudo) e retorna o áudio PCM, ou None"""
+        if not self.stream:
+            return None
+        with self._stream_lock:
+            return self._render(text)
+
+    def _render(self, text: str, on_audio: Optional[Callable[[bytes], None]] = None) -> Optional[bytes]:
+        """Sintetiza no stream mudo (quem chama segura _stream_lock); on_audio recebe cada bloco"""
+        parts = []
+
+        def on_audio_chunk(data: bytes):
+            parts.append(data)
+            if on_audio:
+                on_audio(data)
+
+        self.stream.feed(text)
+        self.stream.play(muted=True, on_audio_chunk=on_audio_chunk)
+        return b"".join(parts) or None
+
+    def prepare(self, text: str, cancel: Optional[threading.Event] = None) -> bool:
+        """Pré-sintetiza uma resposta provável; speak(text) depois só reproduz o áudio.
+
+        Em streaming sintetiza os mesmos trechos de split_speech, cada um guardado no
+        cache assim que fica pronto: cancel interrompe entre um trecho e outro (o
+        stream da engine fica livre para a fala) e a fala usa os trechos já prontos.
+        Retorna True se o áudio da resposta toda ficou no cache.
+        """
+        if not self.audio_cache:
+            return False
+        if self.audio_cache.get(text) is not None:
+            return True
+        for piece in split_speech(text) if self.streaming else [text]:
+            if cancel is not None and cancel.is_set():
+                return False
+            if self.audio_cache.get(piece) is not None:
+                continue
+            with self._stream_lock:
+                self._preparing, self._preparation_aborted = True, False
+                try:
+                    audio = self._render(piece)
+                finally:
+                    self._preparing = False
+                if audio is None or self._preparation_aborted:
+                    return False
+                # Guarda o trecho antes de soltar o stream: a fala que esperava por ele já o encontra
+                self.audio_cache.put(piece, audio)
+        return True
+
+    def _abort_preparation(self):
+        """Interrompe a pré-síntese em andamento (o áudio parcial dela é descartado).
+
+        Chamado quando a fala ainda não tem nenhum som pronto: esperar o trecho que
+        prepare() sintetiza atrasaria o primeiro áudio mais do que sintetizá-lo de novo.
+        """
+        if not self._preparing:
+            return
+        self._preparation_aborted = True
+        try:
+            self.stream.stop()
+        except Exception as e:
+            print(f"⚠️ Não foi possível interromper a pré-síntese: {e}")
+
+    def register_canned(self, texts: Iterable[str], prerender: bool = True):
+        """Registra as frases fixas do bot; com prerender, sintetiza em segundo plano
+        as que ainda não estão no cache em disco (senão, na primeira vez que forem ditas)"""
+        if not self.audio_cache:
+            return
+        self.audio_cache.register_canned(texts)
+        if prerender:
+            threading.Thread(target=self._prerender, name="tts-prerender", daemon=True).start()
+
+    def _prerender(self):
+        """Sintetiza as frases fixas que faltam em disco (uma por vez, sem bloquear a fala)"""
+        missing = self.audio_cache.missing_canned()
+        if not missing:
+            return
+        start = time.perf_counter()
+        for text in missing:
+            try:
+                audio = self.synthesize(text)
+            except Exception as e:
+                print(f"⚠️ Falha ao pré-sintetizar '{text}': {e}")
+                continue
+            if audio:
+                self.audio_cache.put(text, audio)
+        print(f"🔊 {len(missing)} frases fixas sintetizadas para o cache em {time.perf_counter() - start:.1f}s")
+
+    def get_cache_stats(self) -> Optional[dict]:
+        """Retorna os contadores do cache de áudio (None sem cache)"""
+        return self.audio_cache.get_stats() if self.audio_cache else None
+
+    def _pcm_stream_info(self) -> Optional[tuple]:
+        """(formato, canais, taxa) do áudio da engine se ele for PCM reproduzível direto
+        pelo PyAudio (não MP3, por exemplo); senão None e a fala segue sem cache e sem streaming"""
+        try:
+            import pyaudio
+        except ImportError:
+            return None
+        try:
+            stream_info = self.stream.engine.get_stream_info()
+        except Exception as e:
+            print(f"⚠️ Formato de áudio da engine indisponível, cache de voz e streaming desabilitados: {e}")
+            return None
+        return stream_info if stream_info[0] != pyaudio.paCustomFormat else None
+
+    def _play_pcm(self, audio: bytes):
+        """Toca áudio PCM no formato da engine atual.
+
+        A saída do PyAudio fica aberta entre as falas: abrir o dispositivo a cada
+        frase custaria dezenas de milissegundos antes do primeiro som.
+        """
+        import pyaudio
+        stream_format = self.stream.engine.get_stream_info()
+        with self._output_lock:
+            if self._output is None or self._output_format != stream_format:
+                if self._output is not None:
+                    self._output.close()
+                if self._pyaudio is None:
+                    self._pyaudio = pyaudio.PyAudio()
+                audio_format, channels, rate = stream_format
+                self._output = self._pyaudio.open(format=audio_format, channels=channels, rate=rate, output=True)
+                self._output_format = stream_format
+            self._output.write(audio)
+
     def stop_speaking(self):
         """Para a fala atual"""
         if self.stream and self.is_speaking:
             try:
+                self._cancel.set()
                 self.stream.stop()
                 self.is_speaking = False
                 print("🔇 Parando fala...")
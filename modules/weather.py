@@ -1,17 +1,25 @@
 """
 Módulo para consulta de informações meteorológicas usando OpenWeatherAPI
 """
-import requests
 import os
 from typing import Optional, Dict
 from datetime import datetime
-import re
+from modules.intent_matcher import IntentMatcher, default_matcher
 
 
 class WeatherManager:
     """Gerenciador de informações meteorológicas"""
+
+    KEYWORDS = [
+        'clima', 'tempo', 'temperatura', 'chuva', 'sol', 'nuvem',
+        'quente', 'frio', 'graus', '°c', 'celsius', 'umidade',
+        'vento', 'meteorologia', 'previsão'
+    ]
     
-    def __init__(self, api_key: str, city: str = "São Paulo", country_code: str = "BR"):
+    def __init__(self, api_key: str, city: str = "São Paulo", country_code: str = "BR",
+                 matcher: Optional[IntentMatcher] = None):
+        self.matcher = matcher or default_matcher
+        self.matcher.add('weather', self.KEYWORDS)
         self.api_key = api_key
         self.city = city
         self.country_code = country_code
@@ -22,6 +30,7 @@ class WeatherManager:
         if not self.api_key or self.api_key == "your_openweather_api_key_here":
             return self._get_mock_weather()
         
+        import requests  # só quando há chave da API (no modo de desenvolvimento usa dados fictícios)
         try:
             params = {
                 'q': f"{self.city},{self.country_code}",
@@ -92,11 +101,4 @@ class WeatherManager:
     
     def is_weather_question(self, text: str) -> bool:
         """Verifica se a pergunta é sobre clima"""
-        weather_keywords = [
-            'clima', 'tempo', 'temperatura', 'chuva', 'sol', 'nuvem',
-            'quente', 'frio', 'graus', '°c', 'celsius', 'umidade',
-            'vento', 'meteorologia', 'previsão'
-        ]
-        
-        text_lower = text.lower()
-        return any(re.search(rf'\b{keyword}\b', text_lower) for keyword in weather_keywords)
+        return self.matcher.matches(text, 'weather')
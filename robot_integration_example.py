@@ -12,8 +12,8 @@ from chatbot import (
     stop_conversation, 
     ask_question, 
     speak_and_listen,
-    is_bot_ready,
-    get_bot_instance
+    wait_conversation,
+    is_bot_ready
 )
 
 
@@ -41,9 +41,8 @@ def handle_person_interaction(bot):
     conversation_started = start_conversation(duration_minutes=3)
     
     if conversation_started:
-        # Espera a conversa terminar
-        while bot.conversation_active:
-            time.sleep(1)
+        # Espera a conversa terminar (bloqueia sem consultar o estado repetidamente)
+        bot.wait_conversation()
         print("✅ Conversa finalizada!")
     else:
         print("❌ Não foi possível iniciar conversa")
@@ -102,10 +101,8 @@ def test_conversation_mode():
     if start_conversation(duration_minutes=2):
         print("Conversa iniciada! Fale com o robô...")
         
-        # Simula espera enquanto conversa acontece
-        bot = get_bot_instance()
-        while bot.conversation_active:
-            time.sleep(1)
+        # Espera enquanto a conversa acontece
+        wait_conversation()
         
         print("Conversa finalizada!")
 